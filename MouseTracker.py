@@ -1,13 +1,28 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
-import threading
-import time
 import cv2
 import numpy as np
-from pynput import mouse, keyboard
+from pynput import keyboard
 from screeninfo import get_monitors
 import ctypes
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+
+import batch_export
+import heatmap
+import perf
+import render
+import replay
+import session_file
+import simplify
+import spline
+from capture import CaptureEngine, SampleRing
+from image_cache import ImageCache
+from point_store import PointStore
+from preview import PreviewRaster
 
 # Fix for high-DPI scaling
 try:
@@ -15,6 +30,12 @@ try:
 except:
     pass
 
+SESSION_DIR = os.path.join(os.path.expanduser("~"), "MousePathTracer", "sessions")
+PREVIEW_FPS = 30
+HEATMAP_PREVIEW_INTERVAL = 0.25  # seconds between heatmap repaints while recording
+PERF_INTERVAL = 1.0  # seconds between perf readouts in the status bar
+TIMELINE_STEPS = 1000  # replay timeline resolution
+
 class MousePathTracer:
     def __init__(self, root):
         self.root = root
@@ -24,22 +45,60 @@ class MousePathTracer:
 
         # --- State Variables ---
         self.is_recording = False
-        self.points = []
+        self.points = PointStore()
         self.monitors = get_monitors()
-        self.last_point = None
+        self.engine = None
+        self.rec_monitor = None
+        # Monitors relative to rec_monitor when recording all of them, else None
+        self.rec_layout = None
+        self.ring = SampleRing()
+        self.ring_overflowed = 0
+        self.preview_last = None
+        self.preview_spline = None
+        self.lod = None
+        self.lod_t = None
+        self.heat = None
+        # Time of the last sample a rebuilt heatmap took from the store
+        self.heat_until = None
+        self.heat_shown_at = 0.0
+        self.perf = perf.PerfStats()
+        self.perf_shown_at = 0.0
+        self.session = None
+        self.session_path = None
+        self.export_thread = None
+        # Live-encoded video of the current/last recording and the style it was encoded with
+        self.live = None
+        self.live_style = None
+        self.live_finisher = None
+        self.live_result = None
+        # Replay: keyframe index, the inputs it was built from, the shown time
+        # (None = whole path) and the (start, end) ns range to export
+        self.replay = None
+        self.replay_src = None
+        self.replay_pos = None
+        self.export_range = None
         
         # Background settings
         self.bg_mode = tk.StringVar(value="color")
         self.bg_color = "#0a0a0f"
         self.bg_image_path = None
-        self.bg_image_data = None
+        self.bg_cache = ImageCache()
         
         # --- Customizable Settings ---
         self.cfg_color = (237, 107, 255)
         self.cfg_thickness = tk.IntVar(value=4)
         self.cfg_hz = tk.IntVar(value=30) 
+        self.cfg_capture_mode = tk.StringVar(value="event")
         self.cfg_speed_multiplier = tk.DoubleVar(value=1.0)
         self.cfg_show_dots = tk.BooleanVar(value=True)
+        self.cfg_render_mode = tk.StringVar(value="trace")
+        self.cfg_smooth = tk.StringVar(value="Off")
+        self.cfg_export_fps = tk.StringVar(value="Native")
+        self.cfg_simplify = tk.DoubleVar(value=0.5)
+        self.cfg_export_res = tk.StringVar(value="Native")
+        self.cfg_crop = tk.BooleanVar(value=False)
+        self.cfg_export_layout = tk.StringVar(value="Stitched")
+        self.cfg_live_encode = tk.BooleanVar(value=False)
 
         self.setup_styles()
         self.setup_ui()
@@ -61,6 +120,12 @@ class MousePathTracer:
                        foreground="#e8e3f0",
                        indicatorcolor="#1a1625",
                        focuscolor="#252033")
+        style.configure("Horizontal.TProgressbar",
+                        background="#c084fc",
+                        troughcolor="#1a1625",
+                        bordercolor="#3d3450",
+                        lightcolor="#c084fc",
+                        darkcolor="#c084fc")
 
     def setup_ui(self):
         # Main container with two columns
@@ -111,7 +176,8 @@ class MousePathTracer:
         # === DISPLAY ===
         display = create_section(content, "🖥️  DISPLAY")
         self.monitor_combo = ttk.Combobox(display, state="readonly", font=("Segoe UI", 9))
-        self.monitor_combo['values'] = [f"Monitor {i+1}" for i in range(len(self.monitors))]
+        self.monitor_combo['values'] = [f"Monitor {i+1}" for i in range(len(self.monitors))] + \
+            (["All monitors"] if len(self.monitors) > 1 else [])
         self.monitor_combo.current(0)
         self.monitor_combo.pack(fill=tk.X, pady=(0, 8))
         self.monitor_combo.bind("<<ComboboxSelected>>", lambda e: self.sync_canvas_ratio())
@@ -125,6 +191,13 @@ class MousePathTracer:
                  activebackground="#c084fc", sliderrelief=tk.FLAT, showvalue=0,
                  command=self.update_hz_label).pack(fill=tk.X, pady=(3, 0))
 
+        capture_frame = tk.Frame(display, bg="#2d2640")
+        capture_frame.pack(fill=tk.X, pady=(6, 0))
+        ttk.Radiobutton(capture_frame, text="Mouse events", variable=self.cfg_capture_mode, 
+                       value="event").pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(capture_frame, text="Fixed rate", variable=self.cfg_capture_mode, 
+                       value="fixed").pack(side=tk.LEFT)
+
         # === PATH STYLE ===
         style_sec = create_section(content, "🎨  PATH STYLE")
         
@@ -162,6 +235,22 @@ class MousePathTracer:
                        bg="#2d2640", fg="#e8e3f0", selectcolor="#1a1625", 
                        activebackground="#2d2640", font=("Segoe UI", 8)).pack(anchor="w")
 
+        render_mode_frame = tk.Frame(style_sec, bg="#2d2640")
+        render_mode_frame.pack(fill=tk.X, pady=(6, 0))
+        ttk.Radiobutton(render_mode_frame, text="Trace", variable=self.cfg_render_mode, 
+                       value="trace", command=self.redraw_preview).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(render_mode_frame, text="Heatmap", variable=self.cfg_render_mode, 
+                       value="heatmap", command=self.redraw_preview).pack(side=tk.LEFT)
+
+        smooth_row = tk.Frame(style_sec, bg="#2d2640")
+        smooth_row.pack(fill=tk.X, pady=(6, 0))
+        tk.Label(smooth_row, text="Smoothing:", bg="#2d2640", fg="#e8e3f0", 
+                font=("Segoe UI", 8)).pack(side=tk.LEFT, padx=(0, 8))
+        smooth_combo = ttk.Combobox(smooth_row, textvariable=self.cfg_smooth, state="readonly", width=10,
+                                    values=["Off", "60 Hz", "120 Hz", "240 Hz"], font=("Segoe UI", 9))
+        smooth_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        smooth_combo.bind("<<ComboboxSelected>>", lambda e: self.on_smooth_change())
+
         # === BACKGROUND ===
         bg_sec = create_section(content, "🖼️  BACKGROUND")
         
@@ -207,6 +296,57 @@ class MousePathTracer:
         
         tk.Label(exp_sec, text="1x = realtime, 2x = 2x faster, 0.5x = slower", 
                 bg="#2d2640", fg="#6b6380", font=("Segoe UI", 7, "italic")).pack(anchor="w")
+        
+        fps_row = tk.Frame(exp_sec, bg="#2d2640")
+        fps_row.pack(fill=tk.X, pady=(8, 0))
+        tk.Label(fps_row, text="Frame Rate:", bg="#2d2640", fg="#e8e3f0", 
+                font=("Segoe UI", 8)).pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Combobox(fps_row, textvariable=self.cfg_export_fps, state="readonly", width=10,
+                     values=["Native", "24 fps", "30 fps", "60 fps"], 
+                     font=("Segoe UI", 9)).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        res_row = tk.Frame(exp_sec, bg="#2d2640")
+        res_row.pack(fill=tk.X, pady=(6, 0))
+        tk.Label(res_row, text="Resolution:", bg="#2d2640", fg="#e8e3f0", 
+                font=("Segoe UI", 8)).pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Combobox(res_row, textvariable=self.cfg_export_res, state="readonly", width=10,
+                     values=["Native", "2160p", "1440p", "1080p", "720p", "480p"], 
+                     font=("Segoe UI", 9)).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        layout_row = tk.Frame(exp_sec, bg="#2d2640")
+        layout_row.pack(fill=tk.X, pady=(6, 0))
+        tk.Label(layout_row, text="Monitors:", bg="#2d2640", fg="#e8e3f0", 
+                font=("Segoe UI", 8)).pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Combobox(layout_row, textvariable=self.cfg_export_layout, state="readonly", width=10,
+                     values=["Stitched", "Per monitor"], 
+                     font=("Segoe UI", 9)).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        tk.Checkbutton(exp_sec, text="Crop to path", variable=self.cfg_crop, 
+                       bg="#2d2640", fg="#e8e3f0", selectcolor="#1a1625", 
+                       activebackground="#2d2640", font=("Segoe UI", 8)).pack(anchor="w", pady=(4, 0))
+        tk.Checkbutton(exp_sec, text="Encode while recording", variable=self.cfg_live_encode, 
+                       bg="#2d2640", fg="#e8e3f0", selectcolor="#1a1625", 
+                       activebackground="#2d2640", font=("Segoe UI", 8)).pack(anchor="w")
+        
+        tk.Label(exp_sec, text=f"Simplify: {self.cfg_simplify.get():.1f}px", bg="#2d2640", 
+                fg="#e8e3f0", font=("Segoe UI", 8)).pack(anchor="w", pady=(8, 3))
+        self.simplify_label = exp_sec.winfo_children()[-1]
+        
+        tk.Scale(exp_sec, from_=0.0, to=5.0, resolution=0.5, orient=tk.HORIZONTAL, 
+                variable=self.cfg_simplify, bg="#2d2640", fg="#c084fc", 
+                highlightthickness=0, troughcolor="#1a1625", activebackground="#c084fc",
+                sliderrelief=tk.FLAT, showvalue=0, 
+                command=self.update_simplify_label).pack(fill=tk.X, pady=(0, 5))
+        
+        # Shown only while an export is running
+        self.export_frame = tk.Frame(exp_sec, bg="#2d2640")
+        self.export_bar = ttk.Progressbar(self.export_frame, orient=tk.HORIZONTAL, 
+                                          mode="determinate", maximum=100)
+        self.export_bar.pack(fill=tk.X, pady=(8, 4))
+        tk.Button(self.export_frame, text="Cancel Export", command=self.cancel_export,
+                 bg="#3d3450", fg="#e8e3f0", relief=tk.FLAT, 
+                 font=("Segoe UI", 8), cursor="hand2", pady=4,
+                 activebackground="#4a4060").pack(fill=tk.X)
 
         # === ACTION BUTTONS ===
         tk.Frame(content, bg="#3d3450", height=2).pack(fill=tk.X, pady=(15, 12))
@@ -217,10 +357,21 @@ class MousePathTracer:
                                 activebackground="#d8b4fe")
         self.btn_run.pack(fill=tk.X, pady=(0, 8))
 
+        self.btn_open = tk.Button(content, text="📂 OPEN SESSION", bg="#3d3450", fg="#e8e3f0", 
+                                 font=("Segoe UI", 9, "bold"), height=2, relief=tk.FLAT, 
+                                 cursor="hand2", command=self.open_session,
+                                 activebackground="#4a4060")
+        self.btn_open.pack(fill=tk.X, pady=(0, 8))
+
         self.btn_export = tk.Button(content, text="💾 EXPORT VIDEO", state=tk.DISABLED, 
                                    bg="#2d2640", fg="#6b6380", font=("Segoe UI", 9, "bold"), 
                                    height=2, relief=tk.FLAT, command=self.save_video)
         self.btn_export.pack(fill=tk.X, pady=(0, 8))
+
+        self.btn_heatmap = tk.Button(content, text="🔥 SAVE HEATMAP IMAGE", state=tk.DISABLED, 
+                                    bg="#2d2640", fg="#6b6380", font=("Segoe UI", 9, "bold"), 
+                                    height=2, relief=tk.FLAT, command=self.save_heatmap)
+        self.btn_heatmap.pack(fill=tk.X, pady=(0, 8))
         
         tk.Label(content, text="💡 Press F8 to start/stop", 
                 bg="#252033", fg="#6b6380", font=("Segoe UI", 7, "italic")).pack(pady=(5, 10))
@@ -241,6 +392,35 @@ class MousePathTracer:
                                      fg="#a78bca", font=("Segoe UI", 11, "bold"))
         self.status_label.pack(side=tk.LEFT)
 
+        tk.Button(status_frame, text="⤓ Stats", command=self.save_perf_stats,
+                 bg="#2d2640", fg="#a78bca", relief=tk.FLAT, font=("Segoe UI", 8), 
+                 cursor="hand2", activebackground="#3d3450").pack(side=tk.RIGHT)
+        self.perf_label = tk.Label(status_frame, text="", bg="#1a1625", 
+                                   fg="#6b6380", font=("Consolas", 9))
+        self.perf_label.pack(side=tk.LEFT, padx=(15, 0))
+
+        # Replay timeline under the preview; scrubbing seeks through keyframes
+        timeline = tk.Frame(right_col, bg="#1a1625")
+        timeline.pack(side=tk.BOTTOM, fill=tk.X, padx=25, pady=(0, 20))
+        self.timeline_label = tk.Label(timeline, text="--:--.- / --:--.-", bg="#1a1625",
+                                       fg="#a78bca", font=("Consolas", 9))
+        self.timeline_label.pack(side=tk.LEFT, padx=(0, 10))
+        for text, command in (("✕", self.clear_range), ("Out ⟧", self.set_range_out),
+                              ("⟦ In", self.set_range_in)):
+            tk.Button(timeline, text=text, command=command, bg="#2d2640", fg="#a78bca",
+                     relief=tk.FLAT, font=("Segoe UI", 8), cursor="hand2", width=5,
+                     activebackground="#3d3450").pack(side=tk.RIGHT, padx=(4, 0))
+        self.range_label = tk.Label(timeline, text="Export: whole session", bg="#1a1625",
+                                    fg="#6b6380", font=("Consolas", 9))
+        self.range_label.pack(side=tk.RIGHT, padx=(10, 6))
+        self.timeline_var = tk.DoubleVar(value=TIMELINE_STEPS)
+        self.timeline = tk.Scale(timeline, from_=0, to=TIMELINE_STEPS, orient=tk.HORIZONTAL,
+                                 variable=self.timeline_var, bg="#1a1625", fg="#c084fc",
+                                 highlightthickness=0, troughcolor="#2d2640",
+                                 activebackground="#c084fc", sliderrelief=tk.FLAT, showvalue=0,
+                                 command=self.on_timeline)
+        self.timeline.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
         # Canvas container
         canvas_area = tk.Frame(right_col, bg="#1a1625")
         canvas_area.pack(fill=tk.BOTH, expand=True, padx=25, pady=(0, 25))
@@ -250,12 +430,16 @@ class MousePathTracer:
         
         self.canvas = tk.Canvas(canvas_border, bg=self.bg_color, highlightthickness=0)
         self.canvas.pack()
+        self.preview = PreviewRaster(self.canvas, self.bg_cache)
+        self.root.after(1000 // PREVIEW_FPS, self.ui_tick)
 
         self.root.after(200, self.sync_canvas_ratio)
         self.on_bg_mode_change()
 
     def update_hz_label(self, val):
         self.hz_label.config(text=f"Sample Rate: {int(float(val))} Hz")
+        if self.is_recording:
+            self.engine.set_hz(int(float(val)))
     
     def update_thick_label(self, val):
         self.thick_label.config(text=f"Thickness: {int(float(val))}px")
@@ -263,6 +447,10 @@ class MousePathTracer:
     def update_speed_label(self, val):
         self.speed_label.config(text=f"Playback Speed: {float(val):.1f}x")
 
+    def update_simplify_label(self, val):
+        text = "off (exact)" if float(val) == 0 else f"{float(val):.1f}px"
+        self.simplify_label.config(text=f"Simplify: {text}")
+
     def pick_color(self):
         from tkinter import colorchooser
         color = colorchooser.askcolor(initialcolor="#ed6bff", title="Choose Path Color")
@@ -278,6 +466,8 @@ class MousePathTracer:
         if color[1]:
             self.bg_color = color[1]
             self.canvas.config(bg=self.bg_color)
+            self.preview.set_background(self.bg_color)
+            self.redraw_preview()
 
     def pick_bg_image(self):
         filepath = filedialog.askopenfilename(
@@ -285,22 +475,28 @@ class MousePathTracer:
             filetypes=[("Image files", "*.png *.jpg *.jpeg *.bmp *.gif")]
         )
         if filepath:
-            self.bg_image_path = filepath
-            img = cv2.imread(filepath)
-            if img is not None:
-                m = self.monitors[self.monitor_combo.current()]
-                self.bg_image_data = cv2.resize(img, (m.width, m.height))
-                
-                filename = filepath.split('/')[-1].split('\\')[-1]
-                self.bg_image_label.config(text=f"✓ {filename[:25]}..." if len(filename) > 25 else f"✓ {filename}")
-                
-                self.update_canvas_background()
+            self.set_bg_image(filepath)
+
+    def set_bg_image(self, filepath):
+        try:
+            # Decodes once; preview and export fetch sized variants from the cache
+            self.bg_cache.get(filepath)
+        except ValueError as e:
+            messagebox.showerror("Background Image", str(e))
+            return
+        self.bg_image_path = filepath
+        filename = filepath.split('/')[-1].split('\\')[-1]
+        self.bg_image_label.config(text=f"✓ {filename[:25]}..." if len(filename) > 25 else f"✓ {filename}")
+        
+        self.update_canvas_background()
 
     def on_bg_mode_change(self):
         if self.bg_mode.get() == "color":
             self.bg_color_frame.pack(fill=tk.X)
             self.bg_image_frame.pack_forget()
             self.canvas.config(bg=self.bg_color)
+            self.preview.set_background(self.bg_color)
+            self.redraw_preview()
         else:
             self.bg_color_frame.pack_forget()
             self.bg_image_frame.pack(fill=tk.X)
@@ -308,28 +504,154 @@ class MousePathTracer:
                 self.update_canvas_background()
 
     def update_canvas_background(self):
+        if self.bg_mode.get() == "image" and self.bg_image_path:
+            self.preview.set_background(self.bg_image_path)
+            self.redraw_preview()
+
+    def export_background(self, m):
+        # Image sized to the recording's monitor (not the one selected now), else the color
         if self.bg_mode.get() == "image" and self.bg_image_path:
             try:
-                img = Image.open(self.bg_image_path)
-                cw, ch = self.canvas.winfo_width(), self.canvas.winfo_height()
-                if cw > 1 and ch > 1:
-                    img = img.resize((cw, ch), Image.LANCZOS)
-                    self.canvas_bg_image = ImageTk.PhotoImage(img)
-                    self.canvas.delete("bg_image")
-                    self.canvas.create_image(0, 0, anchor=tk.NW, image=self.canvas_bg_image, tags="bg_image")
-                    self.canvas.tag_lower("bg_image")
-            except Exception as e:
+                return self.bg_cache.get(self.bg_image_path, (m.width, m.height))
+            except ValueError as e:
                 print(f"Error loading background: {e}")
+        return self.bg_color
+
+    def redraw_preview(self):
+        if self.cfg_render_mode.get() == "heatmap":
+            self.show_heatmap()
+            return
+        # Coarse LOD tier: anything under half a canvas pixel is invisible in the preview
+        tolerance = self.preview.source_tolerance()
+        if self.is_recording:
+            if self.live is not None:
+                self.load_session_points()
+            # Path is still growing, so simplify a snapshot instead of caching tiers
+            xy, t = self.points.columns()
+            if self.smooth_hz():
+                xy, _, _ = spline.upsample(xy, t, self.smooth_hz())
+            xy = xy[simplify.simplify(xy, tolerance)]
+            self.preview_last = xy[-1] if len(xy) else None
+        else:
+            if self.replay_pos is not None:
+                self.seek_preview(self.replay_pos)
+                return
+            self.ensure_lod()
+            xy = self.lod.xy[self.lod.indices(tolerance)]
+        self.preview.redraw(xy, self.cfg_color, self.cfg_thickness.get(), self.cfg_show_dots.get())
+
+    def ensure_lod(self):
+        # Simplification tiers of the finished path, with each tier point's timestamp
+        if self.lod is None:
+            xy, t = self.points.columns()
+            if self.smooth_hz():
+                xy, t, _ = spline.upsample(xy, t, self.smooth_hz())
+            self.lod, self.lod_t = simplify.PathLOD(xy), t
+
+    def seek_preview(self, time_ns):
+        # Rebuilt whenever the path, canvas size, background or style changed
+        tolerance = self.preview.source_tolerance()
+        style = (self.cfg_color, self.cfg_thickness.get(), self.cfg_show_dots.get())
+        self.ensure_lod()
+        src = self.replay_src
+        if (self.replay is None or src[0] is not self.lod or src[1] is not self.preview.base
+                or src[2] != (tolerance, style)):
+            self.close_replay()
+            idx = self.lod.indices(tolerance)
+            self.replay = replay.KeyframeIndex(self.preview, self.lod.xy[idx], self.lod_t[idx], style)
+            self.replay_src = (self.lod, self.preview.base, (tolerance, style))
+        self.replay.seek(time_ns)
+
+    def close_replay(self):
+        if self.replay is not None:
+            self.replay.close()
+        self.replay, self.replay_src = None, None
+
+    def reset_timeline(self):
+        self.close_replay()
+        self.replay_pos, self.export_range = None, None
+        self.timeline_var.set(TIMELINE_STEPS)
+        self.update_timeline_labels()
+
+    def on_timeline(self, val):
+        if self.is_recording or not self.points: return
+        t = self.points.t()
+        frac = float(val) / TIMELINE_STEPS
+        pos = None if frac >= 1 else int(t[0] + frac * (t[-1] - t[0]))
+        if pos == self.replay_pos: return
+        self.replay_pos = pos
+        self.update_timeline_labels()
+        self.redraw_preview()
+
+    def timeline_pos(self):
+        # Recording time shown on the timeline, in ns
+        return self.points.t()[-1] if self.replay_pos is None else self.replay_pos
+
+    def set_range_in(self):
+        if not self.points: return
+        start, end = self.timeline_pos(), self.points.t()[-1]
+        if self.export_range and self.export_range[1] > start:
+            end = self.export_range[1]
+        if start >= end: return
+        self.export_range = (int(start), int(end))
+        self.update_timeline_labels()
+
+    def set_range_out(self):
+        if not self.points: return
+        start, end = self.points.t()[0], self.timeline_pos()
+        if self.export_range and self.export_range[0] < end:
+            start = self.export_range[0]
+        if start >= end: return
+        self.export_range = (int(start), int(end))
+        self.update_timeline_labels()
+
+    def clear_range(self):
+        self.export_range = None
+        self.update_timeline_labels()
+
+    def update_timeline_labels(self):
+        def fmt(ns):
+            s = max(ns, 0) / 1e9
+            return f"{int(s // 60):02d}:{s % 60:04.1f}"
+        if not self.points:
+            self.timeline_label.config(text="--:--.- / --:--.-")
+            self.range_label.config(text="Export: whole session")
+            return
+        t0 = self.points.t()[0]
+        self.timeline_label.config(text=f"{fmt(self.timeline_pos() - t0)} / {fmt(self.points.t()[-1] - t0)}")
+        if self.export_range:
+            start, end = self.export_range
+            self.range_label.config(text=f"Export: {fmt(start - t0)} – {fmt(end - t0)}", fg="#c084fc")
+        else:
+            self.range_label.config(text="Export: whole session", fg="#6b6380")
+
+    def smooth_hz(self):
+        # None = draw the samples as recorded, otherwise the spline upsampling rate
+        value = self.cfg_smooth.get()
+        return None if value == "Off" else int(value.split()[0])
+
+    def on_smooth_change(self):
+        self.lod = None
+        if self.is_recording:
+            self.preview_spline = spline.SplineStream(self.smooth_hz()) if self.smooth_hz() else None
+        self.redraw_preview()
+
+    def selected_monitor(self):
+        # "All monitors" records the virtual desktop spanning every monitor
+        if self.monitor_combo.current() == len(self.monitors):
+            return session_file.virtual_desktop(self.monitors)
+        return self.monitors[self.monitor_combo.current()]
 
     def sync_canvas_ratio(self):
-        m = self.monitors[self.monitor_combo.current()]
-        ratio = m.width / m.height
+        # A loaded or finished recording keeps its own monitor's shape until the next one starts
+        src = self.rec_monitor or self.selected_monitor()
+        ratio = src.width / src.height
         self.root.update_idletasks()
         
         # Get available space in right column
         right_width = self.root.winfo_width() - 340  # subtract left column width
         avail_w = right_width - 80
-        avail_h = self.root.winfo_height() - 150
+        avail_h = self.root.winfo_height() - 190
         
         if avail_w / avail_h > ratio:
             new_h = avail_h
@@ -339,8 +661,8 @@ class MousePathTracer:
             new_h = int(avail_w / ratio)
         
         self.canvas.config(width=new_w, height=new_h)
-        if self.bg_mode.get() == "image":
-            self.root.after(100, self.update_canvas_background)
+        self.preview.configure(new_w, new_h, src.width, src.height)
+        self.redraw_preview()
 
     def setup_hotkeys(self):
         def on_press(key):
@@ -348,105 +670,474 @@ class MousePathTracer:
         keyboard.Listener(on_press=on_press, daemon=True).start()
 
     def toggle_recording(self):
+        if self.export_thread: return
         if not self.is_recording:
-            self.is_recording, self.points, self.last_point = True, [], None
-            self.canvas.delete("all")
-            if self.bg_mode.get() == "image":
-                self.update_canvas_background()
+            self.is_recording, self.points, self.lod, self.heat = True, PointStore(), None, None
+            self.reset_timeline()
+            self.timeline.config(state=tk.DISABLED)
+            self.ring, self.ring_overflowed, self.preview_last = SampleRing(), 0, None
+            self.preview_spline = spline.SplineStream(self.smooth_hz()) if self.smooth_hz() else None
+            self.perf.reset("capture.")
+            self.perf.reset("preview.")
+            self.discard_live()
+            self.rec_monitor = self.selected_monitor()
+            self.rec_layout = None
+            if self.monitor_combo.current() == len(self.monitors):
+                d = self.rec_monitor
+                self.rec_layout = [session_file.Geometry(m.x - d.x, m.y - d.y, m.width, m.height)
+                                   for m in self.monitors]
+            self.sync_canvas_ratio()
+            self.preview.clear()
             
             self.btn_run.config(text="■ STOP RECORDING", bg="#ef4444", activebackground="#f87171")
             self.status_label.config(text="Recording", fg="#ef4444")
             self.status_indicator.config(fg="#ef4444")
-            self.btn_export.config(state=tk.DISABLED, bg="#2d2640", fg="#6b6380")
-            self.stop_event = threading.Event()
-            threading.Thread(target=self.track_loop, daemon=True).start()
+            for btn in (self.btn_export, self.btn_heatmap):
+                btn.config(state=tk.DISABLED, bg="#2d2640", fg="#6b6380")
+            os.makedirs(SESSION_DIR, exist_ok=True)
+            self.session = session_file.new_session(SESSION_DIR, self.session_meta())
+            path = self.session_path = self.session.path
+            m = self.rec_monitor
+            self.heat, self.heat_until = heatmap.HeatmapAccumulator(m.width, m.height), None
+            per_monitor = self.rec_layout and self.export_layout() == "per-monitor"
+            if (self.cfg_live_encode.get() and self.cfg_render_mode.get() == "trace"
+                    and not self.cfg_crop.get() and not per_monitor):
+                # Samples then live only in the session file and the encoder's short backlog
+                self.perf.reset("export.")
+                self.live = render.LiveEncoder(
+                    os.path.splitext(path)[0] + "-live.mp4", m.width, m.height,
+                    lambda: time.perf_counter_ns() - self.engine.t0, color=self.cfg_color,
+                    thickness=self.cfg_thickness.get(), show_dots=self.cfg_show_dots.get(),
+                    background=self.export_background(m), hz=self.cfg_hz.get(),
+                    speed=self.cfg_speed_multiplier.get(), fps=self.export_fps(),
+                    out_height=self.export_height(), upsample_hz=self.smooth_hz(), stats=self.perf)
+                self.live_style = self.live_style_key()
+            self.engine = CaptureEngine(self.rec_monitor, 
+                                        self.cfg_hz.get(), self.on_sample, 
+                                        mode=self.cfg_capture_mode.get(), stats=self.perf)
+            self.engine.start()
+            if self.live is not None:
+                self.live.start()
         else:
             self.is_recording = False
-            self.stop_event.set()
+            self.engine.stop()
+            self.drain_preview()
+            self.session.close(self.session_meta())
+            if self.live is not None:
+                # The path only exists in the session file; map it before anything redraws
+                self.load_session_points()
+                self.lod = None
+            if self.preview_spline is not None:
+                # Redraw from the whole path rather than flushing the held-back tail
+                self.preview_spline = None
+                self.redraw_preview()
+            if self.live is not None:
+                self.live_finisher = threading.Thread(target=self.finish_live, daemon=True)
+                self.live_finisher.start()
             self.btn_run.config(text="● START RECORDING", bg="#c084fc", activebackground="#d8b4fe")
-            self.status_label.config(text="Complete", fg="#34d399")
+            self.timeline.config(state=tk.NORMAL)
+            self.update_timeline_labels()
+            used, reserved = self.points.memory_usage()
+            self.status_label.config(text=f"Complete · {len(self.points):,} pts · "
+                                          f"{used / 1e6:.1f}/{reserved / 1e6:.1f} MB", fg="#34d399")
             self.status_indicator.config(fg="#34d399")
-            self.btn_export.config(state=tk.NORMAL, bg="#c084fc", fg="white", cursor="hand2",
-                                 activebackground="#d8b4fe")
-
-    def track_loop(self):
-        mouse_ctrl, m = mouse.Controller(), self.monitors[self.monitor_combo.current()]
-        while not self.stop_event.is_set():
-            interval = 1.0 / max(1, self.cfg_hz.get())
-            gx, gy = mouse_ctrl.position
-            if m.x <= gx < m.x + m.width and m.y <= gy < m.y + m.height:
-                rx, ry = gx - m.x, gy - m.y
-                self.points.append((rx, ry))
-                if self.last_point:
-                    self.render_expansion(self.last_point, (rx, ry), interval, m.width, m.height)
-                self.last_point = (rx, ry)
-            time.sleep(interval)
-
-    def render_expansion(self, p1, p2, duration, mw, mh):
-        frames, step_ms = 4, int((duration / 4) * 1000)
-        cw, ch = self.canvas.winfo_width(), self.canvas.winfo_height()
+            for btn in (self.btn_export, self.btn_heatmap):
+                btn.config(state=tk.NORMAL, bg="#c084fc", fg="white", cursor="hand2",
+                           activebackground="#d8b4fe")
+
+    def on_sample(self, t, rx, ry):
+        # Runs on the capture thread (pynput listener or fixed-rate scheduler); never touches Tk
+        if self.live is None:
+            self.points.append(t, rx, ry)
+        else:
+            self.live.push(t, rx, ry)
+        self.session.append(t, rx, ry)
+        self.ring.push(t, rx, ry)
+
+    def load_session_points(self):
+        # Live mode keeps no points in RAM; map the session file as flushed so far
+        # (up to the writer's flush interval behind while recording)
+        _, records = session_file.load_session(self.session_path)
+        self.points = PointStore.from_arrays(*session_file.columns(records))
+
+    def live_style_key(self):
+        # Everything baked into a live-encoded video; any change means a full re-render
+        return (self.cfg_color, self.cfg_thickness.get(), self.cfg_show_dots.get(),
+                self.bg_mode.get(), self.bg_color, self.bg_image_path, self.cfg_hz.get(),
+                self.cfg_speed_multiplier.get(), self.export_fps(), self.export_height(), self.smooth_hz(),
+                self.cfg_simplify.get(), self.cfg_render_mode.get(), self.cfg_crop.get(),
+                self.export_layout(), self.export_range)
+
+    def finish_live(self):
+        try:
+            self.live_result = self.live.finish()
+        except Exception as e:
+            self.live_result = e
+
+    def discard_live(self):
+        if self.live is not None:
+            if self.live_finisher is not None:
+                self.live_finisher.join()
+            self.live.discard()
+        self.live, self.live_finisher, self.live_result = None, None, None
+
+    def ensure_heat(self):
+        # Built from the whole store on demand, then fed incrementally while recording
+        if self.heat is None:
+            if self.is_recording and self.live is not None:
+                self.load_session_points()
+            m = self.rec_monitor
+            self.heat = heatmap.HeatmapAccumulator(m.width, m.height)
+            xy, t = self.points.columns()
+            self.heat.add(xy, t)
+            self.heat_until = t[-1] if len(t) else None
+        return self.heat
+
+    def show_heatmap(self):
+        if self.rec_monitor is None:
+            self.preview.clear()
+            return
+        # Preview raster is RGB, heatmap blending works in BGR
+        frame = self.ensure_heat().render(self.preview.base[..., ::-1])
+        self.preview.show(frame[..., ::-1])
+        self.heat_shown_at = time.monotonic()
+
+    def ui_tick(self):
+        # The only periodic UI work: drain pending samples, draw them in one batch, blit
+        start = time.perf_counter()
+        if self.is_recording:
+            self.perf.gauge("preview.queue_depth").set(len(self.ring))
+            self.drain_preview()
+        self.preview.blit()
+        if self.is_recording:
+            self.perf.histogram("preview.frame_ms").record((time.perf_counter() - start) * 1000)
+        if time.monotonic() - self.perf_shown_at >= PERF_INTERVAL:
+            self.update_perf_label()
+        self.root.after(1000 // PREVIEW_FPS, self.ui_tick)
+
+    def update_perf_label(self):
+        self.perf_shown_at = time.monotonic()
+        snap = self.perf.sample()["metrics"]
+        if self.is_recording:
+            jitter = snap.get("capture.interval_ms", {}).get("std", 0.0)
+            frame = snap.get("preview.frame_ms", {}).get("mean", 0.0)
+            self.perf_label.config(text=
+                f"{self.perf.rate('capture.polls'):.0f}/{self.perf.gauge('capture.target_hz').value} Hz · "
+                f"jitter {jitter:.1f} ms · off-monitor {self.perf.counter('capture.offmonitor').value} · "
+                f"queue {self.perf.gauge('preview.queue_depth').value} · frame {frame:.1f} ms")
+        elif self.export_thread:
+            stage = {name: snap.get(f"export.{name}_ms", {}).get("mean", 0.0) 
+                     for name in ("draw", "encode", "wait")}
+            self.perf_label.config(text=
+                f"draw {stage['draw']:.1f} ms · encode {stage['encode']:.1f} ms · "
+                f"backpressure {stage['wait']:.1f} ms")
+
+    def save_perf_stats(self):
+        filename = filedialog.asksaveasfilename(defaultextension=".json", title="Save Performance Stats",
+                                               filetypes=[("JSON", "*.json"), ("CSV", "*.csv")])
+        if not filename: return
+        try:
+            if filename.lower().endswith(".csv"):
+                self.perf.dump_csv(filename)
+            else:
+                self.perf.dump_json(filename)
+        except OSError as e:
+            messagebox.showerror("Save Performance Stats", str(e))
+
+    def drain_preview(self):
+        if self.ring.overflowed != self.ring_overflowed:
+            # The ring lapped us; the store still has every sample, so redraw from it
+            self.perf.counter("preview.ring_overflow").add(self.ring.overflowed - self.ring_overflowed)
+            self.ring_overflowed = self.ring.overflowed
+            self.ring.drain()
+            self.heat = None
+            self.ensure_heat()
+            self.redraw_preview()
+            return
+        batch = self.ring.drain()
+        if batch is not None:
+            xy, t = batch
+            if self.heat_until is not None:
+                # A rebuild from the store may already hold the start of this batch
+                keep = t > self.heat_until
+                xy, t = xy[keep], t[keep]
+            self.ensure_heat().add(xy, t)
+        if self.preview_spline is not None:
+            batch = self.smooth_batch(batch)
+        if batch is None: return
+        xy, t = batch
+        if self.cfg_render_mode.get() == "heatmap":
+            if time.monotonic() - self.heat_shown_at >= HEATMAP_PREVIEW_INTERVAL:
+                self.show_heatmap()
+        else:
+            if self.preview_last is not None:
+                xy = np.vstack((self.preview_last, xy))
+            self.preview.draw(xy, self.cfg_color, self.cfg_thickness.get(), self.cfg_show_dots.get())
+        self.preview_last = xy[-1]
+
+    def smooth_batch(self, batch):
+        # The spline holds the newest sample back; once the cursor pauses, draw it anyway
+        stream = self.preview_spline
+        if batch is None:
+            batch = (np.empty((0, 2), dtype=np.int32), np.empty(0, dtype=np.int64))
+        xy, t = stream.feed(*batch)
+        held = stream.held_t
+        if held is not None and time.perf_counter_ns() - self.engine.t0 - held > 2 * self.engine.period_ns:
+            sx, st = stream.settle()
+            xy, t = np.vstack((xy, sx)), np.r_[t, st]
+        return (xy, t) if len(t) else None
+
+    def export_fps(self):
+        # None = native (sample rate x speed), otherwise a fixed output frame rate
+        value = self.cfg_export_fps.get()
+        return None if value == "Native" else int(value.split()[0])
+
+    def export_height(self):
+        # None = monitor resolution, otherwise the output height in px
+        value = self.cfg_export_res.get()
+        return None if value == "Native" else int(value.rstrip("p"))
+
+    def export_layout(self):
+        return "per-monitor" if self.cfg_export_layout.get() == "Per monitor" else "stitched"
+
+    def session_meta(self):
+        m = self.rec_monitor
+        meta = {
+            "monitor": {"x": m.x, "y": m.y, "width": m.width, "height": m.height},
+            "hz": self.cfg_hz.get(),
+            "capture_mode": self.cfg_capture_mode.get(),
+            "style": {
+                "color": list(self.cfg_color),
+                "thickness": self.cfg_thickness.get(),
+                "show_dots": self.cfg_show_dots.get(),
+                "bg_mode": self.bg_mode.get(),
+                "bg_color": self.bg_color,
+                "bg_image_path": self.bg_image_path,
+                "speed": self.cfg_speed_multiplier.get(),
+                "fps": self.export_fps(),
+                "simplify": self.cfg_simplify.get(),
+                "mode": self.cfg_render_mode.get(),
+                "out_height": self.export_height(),
+                "crop": self.cfg_crop.get(),
+                "layout": self.export_layout(),
+                "smooth": self.smooth_hz(),
+            },
+        }
+        if self.rec_layout:
+            meta["monitors"] = [g._asdict() for g in self.rec_layout]
+        return meta
+
+    def open_session(self):
+        if self.is_recording: return
+        filepath = filedialog.askopenfilename(
+            title="Open Session",
+            filetypes=[("Mouse Path sessions", "*" + session_file.SESSION_EXT)]
+        )
+        if not filepath: return
+        try:
+            meta, records = session_file.load_session(filepath)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Open Session", str(e))
+            return
+        
+        self.discard_live()
+        self.points = PointStore.from_arrays(*session_file.columns(records))
+        self.lod, self.heat = None, None
+        self.reset_timeline()
+        self.rec_monitor = session_file.monitor_geometry(meta)
+        self.rec_layout = session_file.monitor_layout(meta)
+        self.session_path = filepath
+        for i, m in enumerate(self.monitors):
+            if (m.x, m.y, m.width, m.height) == tuple(self.rec_monitor):
+                self.monitor_combo.current(i)
+        if self.rec_layout and len(self.monitors) > 1:
+            self.monitor_combo.current(len(self.monitors))
+        self.apply_session_style(meta)
+        self.sync_canvas_ratio()
+        
+        self.status_label.config(text=f"Loaded · {len(self.points):,} pts", fg="#34d399")
+        self.status_indicator.config(fg="#34d399")
+        state = tk.NORMAL if len(self.points) else tk.DISABLED
+        for btn in (self.btn_export, self.btn_heatmap):
+            btn.config(state=state, bg="#c084fc", fg="white", cursor="hand2",
+                       activebackground="#d8b4fe")
+
+    def apply_session_style(self, meta):
+        style = meta["style"]
+        self.cfg_hz.set(meta["hz"])
+        self.cfg_capture_mode.set(meta.get("capture_mode", "event"))
+        self.update_hz_label(meta["hz"])
+        self.cfg_color = tuple(style["color"])
         hex_c = "#%02x%02x%02x" % (self.cfg_color[2], self.cfg_color[1], self.cfg_color[0])
-        for i in range(1, frames + 1):
-            t_curr, t_prev = i / frames, (i-1) / frames
-            ix, iy = p1[0] + (p2[0]-p1[0])*t_curr, p1[1] + (p2[1]-p1[1])*t_curr
-            px, py = p1[0] + (p2[0]-p1[0])*t_prev, p1[1] + (p2[1]-p1[1])*t_prev
-            x1, y1, x2, y2 = px*(cw/mw), py*(ch/mh), ix*(cw/mw), iy*(ch/mh)
-            self.root.after(i*step_ms, lambda a=x1, b=y1, c=x2, d=y2: 
-                self.canvas.create_line(a, b, c, d, fill=hex_c, width=self.cfg_thickness.get(), 
-                                      capstyle=tk.ROUND, joinstyle=tk.ROUND))
-            if self.cfg_show_dots.get():
-                r = self.cfg_thickness.get() // 2
-                self.root.after(i*step_ms, lambda a=x2, b=y2: 
-                    self.canvas.create_oval(a-r, b-r, a+r, b+r, fill=hex_c, outline=""))
+        self.color_preview.configure(bg=hex_c)
+        self.color_hex_label.config(text=hex_c.upper())
+        self.cfg_thickness.set(style["thickness"])
+        self.update_thick_label(style["thickness"])
+        self.cfg_show_dots.set(style["show_dots"])
+        self.cfg_speed_multiplier.set(style["speed"])
+        self.update_speed_label(style["speed"])
+        self.cfg_export_fps.set(f"{style['fps']} fps" if style.get("fps") else "Native")
+        self.cfg_simplify.set(style.get("simplify", 0.0))
+        self.cfg_render_mode.set(style.get("mode", "trace"))
+        self.cfg_export_res.set(f"{style['out_height']}p" if style.get("out_height") else "Native")
+        self.cfg_crop.set(style.get("crop", False))
+        self.cfg_smooth.set(f"{style['smooth']} Hz" if style.get("smooth") else "Off")
+        self.cfg_export_layout.set("Per monitor" if style.get("layout") == "per-monitor" else "Stitched")
+        self.update_simplify_label(self.cfg_simplify.get())
+        self.bg_color = style["bg_color"]
+        image_path = style.get("bg_image_path")
+        self.bg_mode.set("image" if style["bg_mode"] == "image" and image_path 
+                         and os.path.exists(image_path) else "color")
+        if self.bg_mode.get() == "image":
+            self.set_bg_image(image_path)
+        self.on_bg_mode_change()
 
     def save_video(self):
         filename = filedialog.asksaveasfilename(defaultextension=".mp4", 
                                                title="Export Video")
-        if not filename or not self.points: return
+        if not filename or not self.points or self.export_thread: return
+        
+        m = self.rec_monitor
+        background = self.export_background(m)
         
-        m = self.monitors[self.monitor_combo.current()]
+        # Native FPS = sample_rate * speed_multiplier; timing comes from the capture timestamps
+        opts = dict(color=self.cfg_color, thickness=self.cfg_thickness.get(), 
+                    show_dots=self.cfg_show_dots.get(), background=background, 
+                    hz=self.cfg_hz.get(), speed=self.cfg_speed_multiplier.get(), 
+                    fps=self.export_fps(), simplify_px=self.cfg_simplify.get(), 
+                    mode=self.cfg_render_mode.get(), out_height=self.export_height(),
+                    crop=self.cfg_crop.get(), upsample_hz=self.smooth_hz(),
+                    t_range=self.export_range)
+        xy, times = self.points.columns()
         
-        # Calculate FPS based on sample rate and speed multiplier
-        # Sample rate = points per second recorded
-        # Speed multiplier = how fast to play it back
-        # FPS = sample_rate * speed_multiplier
-        sample_rate = self.cfg_hz.get()
-        speed_multiplier = self.cfg_speed_multiplier.get()
-        fps = sample_rate * speed_multiplier
+        # Render on a worker thread; the UI polls progress instead of freezing
+        self.perf.reset("export.")
+        self.export_progress, self.export_result = 0.0, None
+        if self.rec_layout and self.export_layout() == "per-monitor":
+            # One video per monitor, rendered from the session file in worker processes
+            image = self.bg_mode.get() == "image" and isinstance(background, np.ndarray)
+            overrides = dict(opts, background=None if image else background,
+                             bg_image=self.bg_image_path if image else None)
+            # None would fall back to the session header; 0 means Native/Off as on the CLI
+            for key in ("fps", "out_height", "upsample_hz"):
+                overrides[key] = overrides[key] or 0
+            if self.export_range:
+                # Batch export takes the range relative to the first sample
+                overrides["t_range"] = tuple(int(v - times[0]) for v in self.export_range)
+            jobs = batch_export.session_jobs(self.session_path, filename, overrides, layout="per-monitor")
+            self.export_cancel = multiprocessing.Event()
+            self.export_thread = threading.Thread(target=self.export_monitors_worker, daemon=True,
+                                                  args=(jobs,))
+        elif self.live is not None and self.live.complete and self.live_style == self.live_style_key():
+            # Already encoded while recording; just wait for the tail and move the file
+            self.export_cancel = threading.Event()
+            self.export_thread = threading.Thread(target=self.finalize_live_worker, daemon=True,
+                                                  args=(filename,))
+        else:
+            self.export_cancel = threading.Event()
+            self.export_thread = threading.Thread(target=self.export_worker, daemon=True,
+                                                  args=(filename, xy, times, m, opts))
+        self.export_thread.start()
         
-        # Calculate actual video duration
-        recorded_duration = len(self.points) / sample_rate
-        video_duration = recorded_duration / speed_multiplier
+        self.export_bar["value"] = 0
+        self.export_frame.pack(fill=tk.X)
+        for btn in (self.btn_run, self.btn_open, self.btn_export, self.btn_heatmap):
+            btn.config(state=tk.DISABLED)
+        self.status_label.config(text="Exporting", fg="#c084fc")
+        self.status_indicator.config(fg="#c084fc")
+        self.root.after(100, self.poll_export)
+
+    def save_heatmap(self):
+        filename = filedialog.asksaveasfilename(defaultextension=".png", title="Save Heatmap",
+                                               filetypes=[("PNG image", "*.png")])
+        if not filename or not self.points: return
+        
+        m = self.rec_monitor
+        background = self.export_background(m)
+        if self.export_height() or self.cfg_crop.get():
+            xy, w, h, region, _ = render.fit_transform(self.points.xy(), m.width, m.height,
+                                                       self.export_height(), self.cfg_crop.get())
+            base = render.fitted_frame(m.width, m.height, background, region, w, h)
+            frame = heatmap.heatmap_image(xy, self.points.t(), w, h, base)
+        else:
+            frame = self.ensure_heat().render(render.base_frame(m.width, m.height, background))
+        if cv2.imwrite(filename, frame):
+            self.status_label.config(text="Heatmap saved", fg="#34d399")
+        else:
+            messagebox.showerror("Save Heatmap", f"Could not write {filename}")
+
+    def export_worker(self, filename, xy, times, m, opts):
+        try:
+            self.export_result = render.render_video(
+                filename, xy, times, m.width, m.height, cancel=self.export_cancel,
+                progress=lambda f: setattr(self, "export_progress", f), stats=self.perf, **opts)
+        except Exception as e:
+            self.export_result = e
+
+    def finalize_live_worker(self, filename):
+        self.live_finisher.join()
+        if not isinstance(self.live_result, Exception):
+            try:
+                shutil.move(self.live.filename, filename)
+            except OSError as e:
+                self.live_result = e
+            else:
+                # The live file is gone; later exports render from the session
+                self.live = None
+        self.export_result = self.live_result
+
+    def export_monitors_worker(self, jobs):
+        files, failed = [], []
+        try:
+            for job, stats in batch_export.run_jobs(jobs, min(len(jobs), os.cpu_count()), 
+                                                    self.export_cancel):
+                if isinstance(stats, Exception):
+                    failed.append(f"{os.path.basename(job[1])}: {stats}")
+                elif stats is not None:
+                    files.append(os.path.basename(job[1]))
+                self.export_progress = (len(files) + len(failed)) / len(jobs)
+        except Exception as e:
+            self.export_result = e
+            return
+        cancelled = self.export_cancel.is_set()
+        self.export_result = None if cancelled else {"files": files, "failed": failed}
+
+    def cancel_export(self):
+        if self.export_thread:
+            self.export_cancel.set()
+
+    def poll_export(self):
+        self.export_bar["value"] = self.export_progress * 100
+        if self.export_thread.is_alive():
+            self.root.after(100, self.poll_export)
+            return
         
-        out = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*'mp4v'), fps, (m.width, m.height))
+        self.export_thread = None
+        self.export_frame.pack_forget()
+        for btn in (self.btn_run, self.btn_open, self.btn_export, self.btn_heatmap):
+            btn.config(state=tk.NORMAL)
+        self.status_indicator.config(fg="#34d399")
         
-        if self.bg_mode.get() == "image" and self.bg_image_data is not None:
-            base_frame = self.bg_image_data.copy()
+        stats = self.export_result
+        if isinstance(stats, Exception):
+            self.status_label.config(text="Export failed", fg="#ef4444")
+            messagebox.showerror("Export Failed", str(stats))
+        elif stats is None:
+            self.status_label.config(text="Export cancelled", fg="#a78bca")
+        elif "files" in stats:
+            self.status_label.config(text="Export complete", fg="#34d399")
+            lines = [f"✓ {name}" for name in stats["files"]] + [f"✗ {err}" for err in stats["failed"]]
+            messagebox.showinfo("Export Complete", 
+                              f"Saved {len(stats['files'])} per-monitor videos:\n\n" + "\n".join(lines))
         else:
-            hex_color = self.bg_color.lstrip('#')
-            rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-            bgr = (rgb[2], rgb[1], rgb[0])
-            base_frame = np.full((m.height, m.width, 3), bgr, dtype=np.uint8)
-        
-        frame = base_frame.copy()
-        
-        for i in range(len(self.points)):
-            curr = self.points[i]
-            if i > 0:
-                prev = self.points[i-1]
-                cv2.line(frame, (int(prev[0]), int(prev[1])), (int(curr[0]), int(curr[1])), 
-                        self.cfg_color, self.cfg_thickness.get(), cv2.LINE_AA)
-                if self.cfg_show_dots.get():
-                    cv2.circle(frame, (int(curr[0]), int(curr[1])), 
-                             self.cfg_thickness.get()//2 + 1, self.cfg_color, -1, cv2.LINE_AA)
-            out.write(frame)
-        
-        out.release()
-        messagebox.showinfo("Export Complete", 
-                          f"Video saved successfully!\n\n"
-                          f"FPS: {fps:.1f}\n"
-                          f"Duration: {video_duration:.2f} seconds\n"
-                          f"Speed: {speed_multiplier:.1f}x")
+            self.status_label.config(text="Export complete", fg="#34d399")
+            messagebox.showinfo("Export Complete", 
+                              f"Video saved successfully!\n\n"
+                              f"Size: {stats['width']}x{stats['height']}\n"
+                              f"FPS: {stats['fps']:.1f}\n"
+                              f"Duration: {stats['duration']:.2f} seconds\n"
+                              f"Speed: {stats['speed']:.1f}x\n"
+                              f"Simplified: {stats['points_removed']:,} of {stats['points']:,} points removed")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,270 @@
+"""Headless batch export of recorded sessions.
+
+    python -m batch_export sessions/*.mpts -o videos --workers 8 --speed 2
+    python -m batch_export all-monitors.mpts --layout per-monitor
+    python -m batch_export demo.mpts --start 12 --end 30
+
+Style options default to the settings saved in each session's header.
+Does not import tkinter or pynput, so it runs on machines without a display.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+import heatmap
+import perf
+import render
+import session_file
+from image_cache import ImageCache
+
+# Per worker process: sessions sharing a background decode and resize it once
+_images = ImageCache()
+# Set by run_jobs in each worker; a multiprocessing.Event that stops renders early
+_cancel = None
+
+
+def session_style(meta, overrides):
+    """Render keyword arguments from a session header plus CLI overrides."""
+    style = meta["style"]
+    opts = {
+        "color": tuple(style["color"]),
+        "thickness": style["thickness"],
+        "show_dots": style["show_dots"],
+        "background": style["bg_color"],
+        "hz": meta["hz"],
+        "speed": style["speed"],
+        "fps": style.get("fps"),
+        "simplify_px": style.get("simplify", 0.0),
+        "mode": style.get("mode", "trace"),
+        "out_height": style.get("out_height"),
+        "crop": style.get("crop", False),
+        "upsample_hz": style.get("smooth"),
+        "bg_image": style.get("bg_image_path") if style["bg_mode"] == "image" else None,
+    }
+    if overrides.get("background"):
+        opts["bg_image"] = None
+    opts.update({k: v for k, v in overrides.items() if v is not None})
+    return opts
+
+
+def session_monitors(path):
+    """Indices of the monitors an all-monitor session visited, else None."""
+    meta, records = session_file.load_session(path)
+    layout = session_file.monitor_layout(meta)
+    if not layout:
+        return None
+    tags = session_file.monitor_tags(session_file.columns(records)[0], layout)
+    return [int(i) for i in np.unique(tags) if i >= 0]
+
+
+def monitor_samples(meta, xy, t, monitor):
+    """One monitor's samples of an all-monitor session.
+
+    Returns (geometry, xy, t, breaks) with xy in that monitor's pixels and
+    breaks marking where the cursor came back from another monitor.
+    """
+    layout = session_file.monitor_layout(meta)
+    if not layout or not 0 <= monitor < len(layout):
+        raise ValueError(f"session has no monitor {monitor + 1}")
+    idx = np.flatnonzero(session_file.monitor_tags(xy, layout) == monitor)
+    if not len(idx):
+        raise ValueError(f"session has no samples on monitor {monitor + 1}")
+    g = layout[monitor]
+    xy = (np.asarray(xy[idx]) - (g.x, g.y)).astype(np.int32)
+    return g, xy, t[idx], np.r_[False, np.diff(idx) > 1]
+
+
+def export_session(path, out_path, overrides, still=False):
+    """Renders one session file; runs inside a worker process.
+
+    still=True writes a single heatmap image of the whole session instead
+    of a video. A "monitor" override renders only that monitor of an
+    all-monitor session, over the whole session's time span so videos of
+    different monitors stay in sync. A "t_range" override of (start, end)
+    ns after the first sample, like the GUI timeline, either end None for
+    the session's own, limits a video to that span. Returns None if
+    cancelled.
+    """
+    start = time.perf_counter()
+    meta, records = session_file.load_session(path)
+    if len(records) == 0:
+        raise ValueError("session has no samples")
+    m = session_file.monitor_geometry(meta)
+    opts = session_style(meta, overrides)
+    monitor = opts.pop("monitor", None)
+    image_path = opts.pop("bg_image")
+    xy, t = session_file.columns(records)
+    if monitor is not None or "t_range" in opts:
+        start_ns, end_ns = opts.get("t_range", (None, None))
+        opts["t_range"] = (t[0] + (start_ns or 0), t[-1] if end_ns is None else t[0] + end_ns)
+        if opts["t_range"][0] > t[-1]:
+            raise ValueError(f"time range starts after the recording ends ({(t[-1] - t[0]) / 1e9:.1f}s)")
+        if opts["t_range"][1] <= opts["t_range"][0]:
+            raise ValueError("time range ends before it starts")
+    if monitor is not None:
+        m, xy, t, opts["breaks"] = monitor_samples(meta, xy, t, monitor)
+    if image_path:
+        opts["background"] = _images.get(image_path, (m.width, m.height))
+    if still:
+        xy, w, h, region, _ = render.fit_transform(xy, m.width, m.height, opts.get("out_height"),
+                                                   opts.get("crop", False), opts.get("crop_padding", 40))
+        base = render.fitted_frame(m.width, m.height, opts["background"], region, w, h)
+        if not cv2.imwrite(out_path, heatmap.heatmap_image(xy, t, w, h, base,
+                                                           dwell=opts.get("dwell", True))):
+            raise ValueError(f"cannot write {out_path}")
+        stats = {"frames": 1, "points": len(t), "points_removed": 0}
+    else:
+        timings = perf.PerfStats()
+        stats = render.render_video(out_path, xy, t, m.width, m.height, stats=timings,
+                                    cancel=_cancel, **opts)
+        if stats is None:
+            return None
+        for stage in ("draw", "encode", "wait"):
+            stats[f"{stage}_ms"] = timings.histogram(f"export.{stage}_ms").summary().get("mean", 0.0)
+    stats["seconds"] = time.perf_counter() - start
+    stats["bytes"] = os.path.getsize(out_path)
+    return stats
+
+
+def session_jobs(path, out_path, overrides, still=False, layout=None):
+    """export_session argument tuples for one session.
+
+    layout="per-monitor" gives one job per visited monitor of an
+    all-monitor session, written as <name>-monitor<N><ext>; anything else
+    renders the session as a whole. Defaults to the session's saved layout.
+    """
+    if layout is None:
+        layout = session_file.read_meta(path)["style"].get("layout", "stitched")
+    monitors = session_monitors(path) if layout == "per-monitor" else None
+    if not monitors:
+        return [(path, out_path, overrides, still)]
+    root, ext = os.path.splitext(out_path)
+    return [(path, f"{root}-monitor{i + 1}{ext}", dict(overrides, monitor=i), still) for i in monitors]
+
+
+def _init_worker(cancel):
+    global _cancel
+    _cancel = cancel
+
+
+def run_jobs(jobs, workers=None, cancel=None):
+    """Runs export_session for each argument tuple in worker processes.
+
+    Yields (job, result) as renders finish; result is the stats dict, None
+    if cancelled, or the exception the render raised. `cancel` is a
+    multiprocessing.Event that stops renders already in progress.
+    """
+    with ProcessPoolExecutor(max_workers=max(1, workers or os.cpu_count()),
+                             initializer=_init_worker, initargs=(cancel,)) as pool:
+        futures = {pool.submit(export_session, *job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = e
+            yield futures[future], result
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="batch_export",
+                                     description="Render Mouse Path Tracer sessions to video.")
+    parser.add_argument("sessions", nargs="+", help="session files (.mpts)")
+    parser.add_argument("-o", "--out-dir", default=".", help="output directory (default: .)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--color", help="path color as #rrggbb")
+    parser.add_argument("--thickness", type=int, help="line thickness in px")
+    parser.add_argument("--dots", dest="show_dots", action="store_true", default=None,
+                        help="draw a dot at every sample")
+    parser.add_argument("--no-dots", dest="show_dots", action="store_false")
+    bg = parser.add_mutually_exclusive_group()
+    bg.add_argument("--bg", help="background color as #rrggbb")
+    bg.add_argument("--bg-image", help="background image file")
+    parser.add_argument("--speed", type=float, help="playback speed multiplier")
+    parser.add_argument("--hz", type=int, help="frames per second of recorded time")
+    parser.add_argument("--fps", type=int,
+                        help="fixed output frame rate (default: hz x speed)")
+    parser.add_argument("--simplify", type=float,
+                        help="drop samples that move the path less than this many px (0 = exact)")
+    parser.add_argument("--smooth", type=int,
+                        help="spline-upsample sparse captures to this rate in Hz (0 = off)")
+    parser.add_argument("--height", type=int, help="scale the video to this many px high (default: native)")
+    parser.add_argument("--crop", action="store_true", default=None,
+                        help="crop to the path's bounding box")
+    parser.add_argument("--crop-padding", type=int, help="px kept around the cropped path (default: 40)")
+    parser.add_argument("--layout", choices=("stitched", "per-monitor"),
+                        help="all-monitor sessions: one virtual-desktop video or one per monitor")
+    parser.add_argument("--mode", choices=("trace", "heatmap"), help="render the path or a density heatmap")
+    parser.add_argument("--no-dwell", dest="dwell", action="store_false", default=None,
+                        help="heatmap counts samples instead of weighting by dwell time")
+    parser.add_argument("--start", type=float, help="video starts this many seconds after the first sample")
+    parser.add_argument("--end", type=float, help="video ends this many seconds after the first sample")
+    parser.add_argument("--still", action="store_true",
+                        help="write one heatmap PNG per session instead of a video")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    overrides = {
+        "color": render.hex_to_bgr(args.color) if args.color else None,
+        "thickness": args.thickness,
+        "show_dots": args.show_dots,
+        "background": args.bg,
+        "bg_image": args.bg_image,
+        "hz": args.hz,
+        "speed": args.speed,
+        "fps": args.fps,
+        "simplify_px": args.simplify,
+        "mode": args.mode,
+        "upsample_hz": args.smooth,
+        "out_height": args.height,
+        "crop": args.crop,
+        "crop_padding": args.crop_padding,
+        "dwell": args.dwell,
+        "t_range": None if args.start is None and args.end is None else
+                   tuple(None if s is None else int(s * 1e9) for s in (args.start, args.end)),
+    }
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    done, failed, total_frames, total_bytes = 0, 0, 0, 0
+    start = time.perf_counter()
+    jobs = []
+    for path in args.sessions:
+        name = os.path.splitext(os.path.basename(path))[0] + (".png" if args.still else ".mp4")
+        out_path = os.path.join(args.out_dir, name)
+        try:
+            jobs += session_jobs(path, out_path, overrides, args.still, args.layout)
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"FAILED {path}: {e}", file=sys.stderr)
+    for job, stats in run_jobs(jobs, args.workers):
+        path = job[1]
+        if isinstance(stats, Exception):
+            failed += 1
+            print(f"FAILED {path}: {stats}", file=sys.stderr)
+            continue
+        done += 1
+        total_frames += stats["frames"]
+        total_bytes += stats["bytes"]
+        print(f"{path}: {stats['frames']} frames in {stats['seconds']:.1f}s  "
+              f"{stats['frames'] / stats['seconds']:.1f} frames/s  "
+              f"{stats['bytes'] / 1e6 / stats['seconds']:.2f} MB/s  "
+              f"({stats['points_removed']}/{stats['points']} points simplified away)")
+        if "draw_ms" in stats:
+            print(f"    per frame: draw {stats['draw_ms']:.2f} ms  encode {stats['encode_ms']:.2f} ms  "
+                  f"backpressure {stats['wait_ms']:.2f} ms")
+
+    elapsed = time.perf_counter() - start
+    print(f"Total: {done}/{done + failed} outputs, {total_frames} frames in {elapsed:.1f}s  "
+          f"{total_frames / elapsed:.1f} frames/s  {total_bytes / 1e6 / elapsed:.2f} MB/s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Headless performance benchmarks.
+
+    python -m benchmarks -o bench.json
+    python -m benchmarks --quick --compare bench.json
+
+Needs no display and no real mouse: monitor geometry comes from a stubbed
+screeninfo.get_monitors and cursor motion from synthetic.py. Results are
+written as JSON so runs can be compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import types
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+FakeMonitor = namedtuple("FakeMonitor", "x y width height name")
+MONITORS = [FakeMonitor(0, 0, 1920, 1080, "1080p"), FakeMonitor(1920, 0, 3840, 2160, "4K")]
+
+
+def stub_monitors(monitors=MONITORS):
+    """Installs a fake screeninfo module so nothing queries real displays."""
+    module = types.ModuleType("screeninfo")
+    module.get_monitors = lambda: list(monitors)
+    sys.modules["screeninfo"] = module
+    return module.get_monitors()
+
+
+def _interval_stats(t_ns, hz):
+    dt = np.diff(t_ns) / 1e6
+    return {
+        "target_ms": 1000 / hz,
+        "achieved_hz": len(dt) / ((t_ns[-1] - t_ns[0]) / 1e9),
+        "mean_ms": float(dt.mean()),
+        "std_ms": float(dt.std()),
+        "p99_ms": float(np.percentile(dt, 99)),
+        "max_ms": float(dt.max()),
+    }
+
+
+def bench_capture(monitor, quick):
+    """Fixed-rate capture loop timing against the configured sample rate."""
+    from capture import CaptureEngine
+    import synthetic
+
+    seconds = 1.0 if quick else 5.0
+    results = {}
+    for hz in (30, 60, 120, 240):
+        xy, _ = synthetic.bezier_path(seconds * 2, hz, monitor.width, monitor.height)
+        path = iter(xy.tolist())
+        samples = []
+        engine = CaptureEngine(monitor, hz, lambda t, x, y: samples.append(t), mode="fixed",
+                               position=lambda: next(path))
+        cpu = time.process_time()
+        engine.start()
+        time.sleep(seconds)
+        engine.stop()
+        stats = _interval_stats(np.array(samples), hz)
+        stats["cpu_pct"] = 100 * (time.process_time() - cpu) / seconds
+        results[f"{hz}hz"] = stats
+    return results
+
+
+def bench_store(quick):
+    """Append throughput of the point store, UI ring and session writer."""
+    from capture import SampleRing
+    from point_store import PointStore
+    import session_file
+
+    n = 200_000 if quick else 2_000_000
+    results = {}
+
+    store = PointStore()
+    start = time.perf_counter()
+    for i in range(n):
+        store.append(i, i, i)
+    elapsed = time.perf_counter() - start
+    used, reserved = store.memory_usage()
+    results["point_store"] = {"appends_per_s": n / elapsed, "bytes_per_sample": used / n,
+                              "reserved_mb": reserved / 1e6}
+
+    ring = SampleRing()
+    start = time.perf_counter()
+    for i in range(n):
+        if not ring.push(i, i, i):
+            ring.drain()
+    results["sample_ring"] = {"pushes_per_s": n / (time.perf_counter() - start)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = session_file.SessionWriter(os.path.join(tmp, "bench" + session_file.SESSION_EXT),
+                                            {"monitor": {}})
+        start = time.perf_counter()
+        for i in range(n):
+            writer.append(i, i, i)
+        writer.close()
+        results["session_writer"] = {"appends_per_s": n / (time.perf_counter() - start)}
+    return results
+
+
+def bench_export(monitors, quick):
+    """render_video throughput at each stubbed monitor resolution."""
+    import render
+    import synthetic
+
+    seconds = 5 if quick else 20
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for m in monitors:
+            xy, t = synthetic.human_path(seconds, 120, m.width, m.height)
+            for label, fps in (("native", None), ("30fps", 30)):
+                out = os.path.join(tmp, f"{m.name}-{label}.mp4")
+                start = time.perf_counter()
+                stats = render.render_video(out, xy, t, m.width, m.height, hz=30, fps=fps)
+                elapsed = time.perf_counter() - start
+                results[f"{m.name}_{label}"] = {"frames": stats["frames"], "seconds": elapsed,
+                                                "frames_per_s": stats["frames"] / elapsed,
+                                                "mb_per_s": os.path.getsize(out) / 1e6 / elapsed}
+    return results
+
+
+def bench_preview(monitor, quick):
+    """Preview raster cost as the session grows: full redraw, per-tick batch, blit."""
+    from PIL import Image
+    from preview import PreviewRaster
+    import simplify
+    import synthetic
+
+    hz, tick_hz = 60, 30
+    minutes = (1, 5) if quick else (1, 10, 60)
+    style = ((237, 107, 255), 4, True)
+    results = {}
+    for mins in minutes:
+        xy, _ = synthetic.human_path(mins * 60, hz, monitor.width, monitor.height)
+        raster = PreviewRaster(None)
+        raster.configure(960, 540, monitor.width, monitor.height)
+
+        start = time.perf_counter()
+        lod = simplify.PathLOD(xy)
+        raster.redraw(xy[lod.indices(raster.source_tolerance())], *style)
+        redraw = time.perf_counter() - start
+
+        batch = hz // tick_hz + 1
+        ticks = 200
+        start = time.perf_counter()
+        for k in range(ticks):
+            end = len(xy) - (ticks - k) * (batch - 1)
+            raster.draw(xy[end - batch:end], *style)
+        tick = (time.perf_counter() - start) / ticks
+
+        start = time.perf_counter()
+        for _ in range(20):
+            Image.fromarray(raster.frame)
+        blit = (time.perf_counter() - start) / 20
+
+        results[f"{mins}min"] = {"samples": len(xy), "full_redraw_ms": redraw * 1000,
+                                 "tick_draw_ms": tick * 1000, "blit_convert_ms": blit * 1000}
+    return results
+
+
+BENCHMARKS = ("capture", "store", "export", "preview")
+
+
+def run(only, quick):
+    monitors = stub_monitors()
+    results = {}
+    for name in only:
+        print(f"running {name}...", file=sys.stderr)
+        if name == "capture":
+            results[name] = bench_capture(monitors[0], quick)
+        elif name == "store":
+            results[name] = bench_store(quick)
+        elif name == "export":
+            results[name] = bench_export(monitors, quick)
+        elif name == "preview":
+            results[name] = bench_preview(monitors[0], quick)
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def _flatten(tree, prefix=""):
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+def compare(old, new):
+    before = dict(_flatten(old["results"]))
+    for key, value in _flatten(new["results"]):
+        if key in before and before[key]:
+            print(f"{key:45s} {before[key]:14.3f} -> {value:14.3f}  ({value / before[key]:6.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Headless Mouse Path Tracer benchmarks.")
+    parser.add_argument("-o", "--out", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="shorter runs for a smoke check")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    only = [name for name in args.only.split(",") if name]
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    report = run(only, args.quick)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    else:
+        for key, value in _flatten(report["results"]):
+            print(f"{key:45s} {value:14.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import threading
+import time
+
+import numpy as np
+
+import perf
+
+
+class CaptureEngine:
+    """Samples the cursor inside one monitor and emits on_sample(t_ns, x, y).
+
+    `monitor` is any x/y/width/height geometry; passing the virtual desktop
+    (session_file.virtual_desktop) records across all monitors at once.
+
+    mode="event" follows pynput move events, throttled to `hz`; a move
+    that arrived too soon is emitted by the next event or, if none comes,
+    by a flush thread about a period later.
+    mode="fixed" polls on a drift-free deadline schedule at `hz`.
+
+    Timestamps are time.perf_counter_ns() relative to start(). While the
+    cursor is idle nothing is emitted; once motion resumes the resting
+    point is re-emitted with the time it was last seen there (the last
+    poll in fixed mode, one period before the first move event in event
+    mode) so playback keeps the pause.
+
+    Polls/moves, their intervals, emitted samples and off-monitor drops are
+    recorded under "capture.*" in `stats` (a perf.PerfStats).
+    """
+
+    def __init__(self, monitor, hz, on_sample, mode="event", position=None, stats=None):
+        self.monitor = monitor
+        self.on_sample = on_sample
+        self.mode = mode
+        self.stats = stats or perf.PerfStats()
+        self._polls = self.stats.counter("capture.polls")
+        self._intervals = self.stats.histogram("capture.interval_ms")
+        self._samples = self.stats.counter("capture.samples")
+        self._offmonitor = self.stats.counter("capture.offmonitor")
+        self._last_poll = None
+        self.set_hz(hz)
+        # Callable returning the global (x, y) cursor position; pynput by default
+        self._position = position
+        self._stop = threading.Event()
+        # Serializes the listener callback and the flush thread (one producer)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._listener = None
+        self._last = None
+        self._last_t = None
+        self._held_t = None
+        self._pending = None
+        self._last_move = None
+        self.t0 = 0
+
+    def set_hz(self, hz):
+        self.period_ns = int(1e9 / max(1, hz))
+        self.stats.gauge("capture.target_hz").set(max(1, hz))
+
+    def start(self):
+        self._stop.clear()
+        self.t0 = time.perf_counter_ns()
+        if self._position is None:
+            # Imported lazily so the engine can be driven headless with a fake source
+            from pynput import mouse
+            ctrl = mouse.Controller()
+            self._position = lambda: ctrl.position
+        if self.mode == "event":
+            self._sample(0, *self._position())
+            self._last_move = 0
+            from pynput import mouse
+            self._listener = mouse.Listener(on_move=self._on_move, daemon=True)
+            self._listener.start()
+            self._thread = threading.Thread(target=self._run_flush, daemon=True)
+            self._thread.start()
+        else:
+            self._thread = threading.Thread(target=self._run_fixed, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.stop()
+            # A move callback still running would race the flush below
+            self._listener.join()
+            self._listener = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._pending is not None:
+            self._sample(*self._pending)
+            self._pending = None
+
+    def _inside(self, gx, gy):
+        m = self.monitor
+        return m.x <= gx < m.x + m.width and m.y <= gy < m.y + m.height
+
+    def _emit(self, t, rx, ry):
+        self._last, self._last_t = (rx, ry), t
+        self._samples.add()
+        self.on_sample(t, rx, ry)
+
+    def _sample(self, t, gx, gy):
+        if self._last_poll is None or t > self._last_poll:
+            if self._last_poll is not None:
+                self._intervals.record((t - self._last_poll) / 1e6)
+            self._last_poll = t
+            self._polls.add()
+        if not self._inside(gx, gy):
+            self._offmonitor.add()
+            return
+        rx, ry = int(gx - self.monitor.x), int(gy - self.monitor.y)
+        if (rx, ry) == self._last:
+            self._held_t = t
+            return
+        if self._held_t is not None:
+            # Close the idle stretch so the path waits before moving on
+            self._emit(self._held_t, *self._last)
+            self._held_t = None
+        self._emit(t, rx, ry)
+
+    def _on_move(self, gx, gy):
+        if self._stop.is_set():
+            return False
+        with self._lock:
+            self._move(time.perf_counter_ns() - self.t0, gx, gy)
+
+    def _run_flush(self):
+        # The cursor stopped on a throttled move; emit it rather than wait for the next event
+        while not self._stop.wait(self.period_ns / 2e9):
+            with self._lock:
+                pending = self._pending
+                if pending is not None and time.perf_counter_ns() - self.t0 - pending[0] >= self.period_ns:
+                    self._pending = None
+                    self._sample(*pending)
+
+    def _move(self, t, gx, gy):
+        rested = self._last_move is not None and t - self._last_move >= 2 * self.period_ns
+        self._last_move = t
+        if self._last_t is not None and t - self._last_t < self.period_ns:
+            self._pending = (t, gx, gy)
+            return
+        if self._pending is not None:
+            pt, px, py = self._pending
+            self._pending = None
+            if t - pt >= self.period_ns:
+                # Cursor rested at the throttled point; keep it before moving on
+                self._sample(pt, px, py)
+        if rested and self._last is not None:
+            # No events since the last one: the cursor sat still until just now
+            self._held_t = t - self.period_ns
+        self._sample(t, gx, gy)
+
+    def _run_fixed(self):
+        deadline = time.perf_counter_ns()
+        while not self._stop.is_set():
+            gx, gy = self._position()
+            self._sample(time.perf_counter_ns() - self.t0, gx, gy)
+            deadline += self.period_ns
+            delay = deadline - time.perf_counter_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+            else:
+                # Fell behind (e.g. suspended); resync rather than burst
+                deadline = time.perf_counter_ns()
+
+
+class SampleRing:
+    """Single-producer/single-consumer ring of (t, x, y) samples.
+
+    The capture thread pushes and the UI thread drains. Each side only
+    advances its own counter, so no lock is needed. If the consumer falls
+    a whole ring behind, new samples are dropped and counted in `overflowed`.
+    """
+
+    def __init__(self, capacity=16384):
+        self._xy = np.empty((capacity, 2), dtype=np.int32)
+        self._t = np.empty(capacity, dtype=np.int64)
+        self._capacity = capacity
+        self._head = 0
+        self._tail = 0
+        self.overflowed = 0
+
+    def __len__(self):
+        return self._head - self._tail
+
+    def push(self, t, x, y):
+        head = self._head
+        if head - self._tail >= self._capacity:
+            self.overflowed += 1
+            return False
+        i = head % self._capacity
+        self._xy[i, 0] = x
+        self._xy[i, 1] = y
+        self._t[i] = t
+        # Publish only after the slot is written
+        self._head = head + 1
+        return True
+
+    def drain(self):
+        """Copies out everything pending as (xy, t), or None if empty."""
+        head, tail = self._head, self._tail
+        if head == tail:
+            return None
+        a, b = tail % self._capacity, head % self._capacity
+        if a < b:
+            xy, t = self._xy[a:b].copy(), self._t[a:b].copy()
+        else:
+            xy = np.concatenate((self._xy[a:], self._xy[:b]))
+            t = np.concatenate((self._t[a:], self._t[:b]))
+        self._tail = head
+        return xy, t
@@ -0,0 +1,80 @@
+"""Density heatmaps of where the cursor spent its time.
+
+Samples are binned on a coarse grid over the monitor with np.bincount,
+optionally weighted by dwell time, then blurred, colormapped and blended
+over the background. Only depends on OpenCV and NumPy.
+"""
+import cv2
+import numpy as np
+
+
+class HeatmapAccumulator:
+    """Incremental per-cell totals for one monitor.
+
+    With dwell=True each sample is weighted by the time until the next
+    sample (capped at max_dwell seconds), so an idle cursor counts for as
+    long as it rested; otherwise every sample counts once.
+    """
+
+    def __init__(self, width, height, cell=4, dwell=True, max_dwell=10.0):
+        self.width, self.height, self.cell = width, height, cell
+        self.grid_w = -(-width // cell)
+        self.grid_h = -(-height // cell)
+        self.grid = np.zeros(self.grid_w * self.grid_h, dtype=np.float64)
+        self.dwell = dwell
+        self.max_dwell_ns = max_dwell * 1e9
+        self.count = 0
+        # Last sample's cell and time; its dwell is known once the next one arrives
+        self._pending = None
+
+    def _cells(self, xy):
+        gx = np.clip(xy[:, 0] // self.cell, 0, self.grid_w - 1)
+        gy = np.clip(xy[:, 1] // self.cell, 0, self.grid_h - 1)
+        return gy.astype(np.int64) * self.grid_w + gx
+
+    def add(self, xy, t=None, chunk=4_000_000):
+        """Adds samples in chunks so memory stays flat for huge sessions."""
+        for start in range(0, len(xy), chunk):
+            self._add(np.asarray(xy[start:start + chunk]),
+                      None if t is None else np.asarray(t[start:start + chunk]))
+
+    def _add(self, xy, t):
+        if not len(xy):
+            return
+        cells = self._cells(xy)
+        self.count += len(cells)
+        if not self.dwell or t is None:
+            self.grid += np.bincount(cells, minlength=self.grid.size)
+            return
+        if self._pending is not None:
+            cells = np.r_[self._pending[0], cells]
+            t = np.r_[self._pending[1], t]
+        weights = np.clip(np.diff(t), 0, self.max_dwell_ns) / 1e9
+        self.grid += np.bincount(cells[:-1], weights, minlength=self.grid.size)
+        self._pending = (cells[-1], t[-1])
+
+    def render(self, base, blur=2.0, colormap=cv2.COLORMAP_INFERNO, alpha=0.75):
+        """Blends the heatmap over `base` (BGR, any size) and returns a new frame.
+
+        `blur` is the Gaussian sigma in grid cells. Intensity is log-scaled
+        so brief visits stay visible next to long dwells, and acts as the
+        per-pixel blend weight so cold areas show the background.
+        """
+        heat = np.log1p(self.grid.reshape(self.grid_h, self.grid_w)).astype(np.float32)
+        if blur > 0:
+            heat = cv2.GaussianBlur(heat, (0, 0), blur)
+        peak = heat.max()
+        if peak > 0:
+            heat /= peak
+        h, w = base.shape[:2]
+        heat = cv2.resize(heat, (w, h), interpolation=cv2.INTER_LINEAR)
+        colored = cv2.applyColorMap((heat * 255).astype(np.uint8), colormap)
+        weight = (heat * alpha)[..., None]
+        return (base * (1 - weight) + colored * weight).astype(np.uint8)
+
+
+def heatmap_image(xy, t, width, height, base, dwell=True, cell=4, blur=2.0):
+    """One-shot heatmap of a whole session over `base` (BGR)."""
+    acc = HeatmapAccumulator(width, height, cell=cell, dwell=dwell)
+    acc.add(xy, t)
+    return acc.render(base, blur=blur)
@@ -0,0 +1,78 @@
+"""Decoded and resized background images shared by preview and export.
+
+Each file is decoded once; resized variants are cached next to it, keyed
+by (path, mtime, size), in an LRU bounded by total pixel memory. Returned
+arrays are read-only BGR and shared between callers, so whoever draws on
+a background copies it first (render.base_frame does).
+"""
+import os
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class ImageCache:
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, path, size=None):
+        """BGR image at `path`, resized to size=(width, height) if given.
+
+        Raises ValueError if the file cannot be decoded.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError as e:
+            raise ValueError(f"cannot read background image {path}: {e.strerror}") from None
+        key = (path, mtime, tuple(size) if size else None)
+        image = self._entries.get(key)
+        if image is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return image
+        self.misses += 1
+        if size is None:
+            self._drop_stale(path, mtime)
+            image = _decode(path)
+        else:
+            source = self.get(path)
+            w, h = key[2]
+            shrink = w * h < source.shape[0] * source.shape[1]
+            image = cv2.resize(source, (w, h), interpolation=cv2.INTER_AREA if shrink else cv2.INTER_CUBIC)
+        image.flags.writeable = False
+        self._store(key, image)
+        return image
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def _store(self, key, image):
+        self._entries[key] = image
+        self.nbytes += image.nbytes
+        # Always keep the newest entry, even if it alone exceeds the cap
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def _drop_stale(self, path, mtime):
+        # The file changed on disk; its old decode and variants are dead weight
+        for key in [k for k in self._entries if k[0] == path and k[1] != mtime]:
+            self.nbytes -= self._entries.pop(key).nbytes
+
+
+def _decode(path):
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if image is None:
+        # OpenCV has no GIF reader; Pillow does
+        try:
+            from PIL import Image
+            with Image.open(path) as img:
+                image = np.ascontiguousarray(np.asarray(img.convert("RGB"))[..., ::-1])
+        except (ImportError, OSError):
+            raise ValueError(f"cannot read background image {path}") from None
+    return image
@@ -0,0 +1,146 @@
+"""Low-overhead performance counters for capture, preview and export.
+
+Recording a value is a few attribute updates and one bisect, cheap enough
+for the capture thread at any sample rate. Writers do not lock; under the
+GIL the worst case is a lost increment, which is fine for diagnostics.
+"""
+import bisect
+import csv
+import json
+import time
+from collections import deque
+
+# Histogram bucket upper edges in milliseconds
+BUCKETS_MS = (0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def add(self, n=1):
+        self.value += n
+
+    def summary(self):
+        return {"value": self.value}
+
+
+class Gauge:
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def summary(self):
+        return {"value": self.value}
+
+
+class Histogram:
+    """Bucketed distribution with exact count/mean/std/min/max."""
+
+    def __init__(self, edges=BUCKETS_MS):
+        self.edges = edges
+        self.reset()
+
+    def reset(self):
+        self.buckets = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, value):
+        self.buckets[bisect.bisect_left(self.edges, value)] += 1
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        # Upper edge of the bucket holding the q-th percentile
+        if not self.count:
+            return 0.0
+        rank, seen = q / 100 * self.count, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return self.edges[i] if i < len(self.edges) else self.max
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        mean = self.total / self.count
+        return {
+            "count": self.count,
+            "mean": mean,
+            "std": max(0.0, self.total_sq / self.count - mean * mean) ** 0.5,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+        }
+
+
+class PerfStats:
+    """Named counters, gauges and histograms plus a bounded snapshot history."""
+
+    def __init__(self, history=3600):
+        self._metrics = {}
+        self._rates = {}
+        self.history = deque(maxlen=history)
+
+    def _get(self, name, kind):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = kind()
+        return metric
+
+    def counter(self, name):
+        return self._get(name, Counter)
+
+    def gauge(self, name):
+        return self._get(name, Gauge)
+
+    def histogram(self, name):
+        return self._get(name, Histogram)
+
+    def reset(self, prefix=""):
+        for name in [n for n in self._metrics if n.startswith(prefix)]:
+            del self._metrics[name]
+            self._rates.pop(name, None)
+
+    def rate(self, name):
+        """Per-second rate of a counter since the previous call."""
+        now, value = time.perf_counter(), self.counter(name).value
+        then, before = self._rates.get(name, (now, value))
+        self._rates[name] = (now, value)
+        return (value - before) / (now - then) if now > then else 0.0
+
+    def snapshot(self):
+        return {name: metric.summary() for name, metric in sorted(self._metrics.items())}
+
+    def sample(self):
+        """Appends a timestamped snapshot to the history and returns it."""
+        snap = {"time": time.time(), "metrics": self.snapshot()}
+        self.history.append(snap)
+        return snap
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"current": self.snapshot(), "history": list(self.history)}, f, indent=2)
+
+    def dump_csv(self, path):
+        # One row per history snapshot and metric field
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["time", "metric", "field", "value"])
+            for snap in list(self.history) + [{"time": time.time(), "metrics": self.snapshot()}]:
+                for name, fields in snap["metrics"].items():
+                    for field, value in fields.items():
+                        writer.writerow([f"{snap['time']:.3f}", name, field, value])
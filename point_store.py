@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class PointStore:
+    """Append-only columnar store for (t, x, y) samples.
+
+    Coordinates live in an (n, 2) int32 block and timestamps in an int64
+    column. Capacity grows geometrically so append is amortized O(1), and
+    the xy()/t() views hand the data to NumPy/OpenCV without copying.
+
+    Safe for one appending thread plus any number of readers: columns are
+    swapped in before the length that makes them visible is published.
+    """
+
+    def __init__(self, capacity=4096):
+        self._cols = (np.empty((capacity, 2), dtype=np.int32),
+                      np.empty(capacity, dtype=np.int64))
+        self._n = 0
+
+    @classmethod
+    def from_arrays(cls, xy, t):
+        # Wraps existing columns (e.g. a memory-mapped session) without copying
+        store = cls.__new__(cls)
+        store._cols = (xy, t)
+        store._n = len(t)
+        return store
+
+    def __len__(self):
+        return self._n
+
+    def append(self, t, x, y):
+        n = self._n
+        xy, ts = self._cols
+        if n == len(ts):
+            xy, ts = self._grow(max(4096, n * 2))
+        xy[n, 0] = x
+        xy[n, 1] = y
+        ts[n] = t
+        self._n = n + 1
+
+    def _grow(self, capacity):
+        n = self._n
+        xy = np.empty((capacity, 2), dtype=np.int32)
+        ts = np.empty(capacity, dtype=np.int64)
+        xy[:n] = self._cols[0][:n]
+        ts[:n] = self._cols[1][:n]
+        self._cols = (xy, ts)
+        return self._cols
+
+    def columns(self):
+        # Read the length first: columns published before it always cover it
+        n = self._n
+        xy, ts = self._cols
+        return xy[:n], ts[:n]
+
+    def xy(self):
+        return self.columns()[0]
+
+    def t(self):
+        return self.columns()[1]
+
+    def last(self):
+        n = self._n
+        if not n:
+            return None
+        xy, ts = self._cols
+        return int(ts[n-1]), int(xy[n-1, 0]), int(xy[n-1, 1])
+
+    def memory_usage(self):
+        # (bytes in use, bytes reserved)
+        xy, ts = self._cols
+        per_row = xy.itemsize * 2 + ts.itemsize
+        return self._n * per_row, len(ts) * per_row
@@ -0,0 +1,109 @@
+import tkinter as tk
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+import render
+from image_cache import ImageCache
+
+
+class PreviewRaster:
+    """Live preview drawn into an offscreen raster and shown as one canvas image.
+
+    Segments are drawn into a NumPy RGB buffer at canvas resolution and
+    blit() copies the buffer into a single PhotoImage only when something
+    changed, so repaint cost depends on the canvas size rather than on the
+    session length. All methods run on the Tk thread; only blit() touches
+    Tk, so the raster itself can be driven headless (see benchmarks).
+    """
+
+    def __init__(self, canvas, cache=None):
+        self.canvas = canvas
+        self.cache = cache if cache is not None else ImageCache()
+        self.frame = None
+        self.width = self.height = 0
+        self._scale = np.ones(2)
+        self._background = render.DEFAULT_BG
+        self._base = None
+        self._photo = None
+        self._item = None
+        self._dirty = False
+
+    def configure(self, width, height, source_width, source_height):
+        """Sizes the raster to the canvas; points arrive in source pixels."""
+        if width < 2 or height < 2:
+            return
+        self.width, self.height = width, height
+        self._scale = np.array([width / source_width, height / source_height])
+        self._build_base()
+
+    def source_tolerance(self, px=0.5):
+        """`px` canvas pixels expressed in source pixels, for picking an LOD tier."""
+        return float(f"{px / self._scale.min():.2g}")
+
+    def set_background(self, background):
+        """`background` is a hex color or an image path, fitted to the raster.
+
+        Image variants come from the shared cache, so resizing the canvas
+        back to a size it had before costs no decode or resample.
+        """
+        self._background = background
+        if self.width:
+            self._build_base()
+
+    def _build_base(self):
+        color = self._background
+        if not color.startswith("#"):
+            try:
+                img = self.cache.get(self._background, (self.width, self.height))
+                self._base = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+                color = None
+            except ValueError as e:
+                # File went away since it was picked; keep previewing on the default color
+                print(f"Error loading background: {e}")
+                color = render.DEFAULT_BG
+        if color:
+            b, g, r = render.hex_to_bgr(color)
+            self._base = np.full((self.height, self.width, 3), (r, g, b), dtype=np.uint8)
+        self.frame = self._base.copy()
+        self._dirty = True
+
+    def clear(self):
+        if self._base is not None:
+            np.copyto(self.frame, self._base)
+            self._dirty = True
+
+    @property
+    def base(self):
+        """Background alone at raster size (RGB)."""
+        return self._base
+
+    def show(self, image):
+        """Replaces the raster with a full RGB image of the same size."""
+        if self.frame is not None:
+            np.copyto(self.frame, image)
+            self._dirty = True
+
+    def draw(self, pts, color, thickness, show_dots):
+        """Draws a run of points given in source pixels; color is BGR."""
+        if self.frame is None:
+            return
+        scaled = np.rint(np.asarray(pts) * self._scale).astype(np.int32)
+        render.draw_path(self.frame, scaled, color[::-1], thickness, show_dots)
+        self._dirty = True
+
+    def redraw(self, pts, color, thickness, show_dots):
+        """Resets to the background and draws a whole path in one pass."""
+        self.clear()
+        self.draw(pts, color, thickness, show_dots)
+
+    def blit(self):
+        if not self._dirty or self.frame is None:
+            return
+        if self._photo is None or (self._photo.width(), self._photo.height()) != (self.width, self.height):
+            self._photo = ImageTk.PhotoImage("RGB", (self.width, self.height))
+            self.canvas.delete("preview")
+            self._item = self.canvas.create_image(0, 0, anchor=tk.NW, image=self._photo, tags="preview")
+        self._dirty = False
+        self._photo.paste(Image.fromarray(self.frame))
@@ -0,0 +1,409 @@
+"""Video rendering for recorded paths.
+
+Only depends on OpenCV and NumPy so it can run headless (see batch_export).
+"""
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import heatmap
+import perf
+import simplify
+import spline
+from capture import SampleRing
+
+DEFAULT_COLOR = (237, 107, 255)
+DEFAULT_BG = "#0a0a0f"
+
+
+def hex_to_bgr(hex_color):
+    hex_color = hex_color.lstrip('#')
+    rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    return (rgb[2], rgb[1], rgb[0])
+
+
+def base_frame(width, height, background=DEFAULT_BG):
+    """Background as a BGR frame; `background` is a hex color or a BGR image."""
+    if isinstance(background, np.ndarray):
+        if background.shape[:2] != (height, width):
+            return cv2.resize(background, (width, height))
+        return background.copy()
+    return np.full((height, width, 3), hex_to_bgr(background), dtype=np.uint8)
+
+
+def fit_transform(xy, width, height, out_height=None, crop=False, padding=40):
+    """Maps monitor-pixel points into the output frame in one vectorized pass.
+
+    The source region is the whole width x height monitor, or with
+    crop=True the path's bounding box grown by `padding` source pixels
+    (clamped to the monitor). `out_height` rescales that region to the
+    given height keeping its aspect ratio. Frame sizes are rounded down to
+    even numbers for the encoder. Returns (xy_out, out_w, out_h, region,
+    scale) with region = (x0, y0, x1, y1) in source pixels.
+    """
+    x0, y0, x1, y1 = 0, 0, width, height
+    if crop and len(xy):
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        x0, y0 = max(0, int(lo[0]) - padding), max(0, int(lo[1]) - padding)
+        x1, y1 = min(width, int(hi[0]) + padding + 1), min(height, int(hi[1]) + padding + 1)
+    scale = out_height / (y1 - y0) if out_height else 1.0
+    out_w = max(2, int((x1 - x0) * scale) // 2 * 2)
+    out_h = max(2, int((y1 - y0) * scale) // 2 * 2)
+    if scale == 1.0 and (x0, y0) == (0, 0):
+        return xy, out_w, out_h, (x0, y0, x1, y1), scale
+    xy_out = np.rint((xy - np.array([x0, y0])) * scale).astype(np.int32)
+    return xy_out, out_w, out_h, (x0, y0, x1, y1), scale
+
+
+def fitted_frame(width, height, background, region, out_w, out_h):
+    """Base frame for a fit_transform output: background cropped to region, then scaled."""
+    if isinstance(background, np.ndarray) and region != (0, 0, width, height):
+        x0, y0, x1, y1 = region
+        if background.shape[:2] != (height, width):
+            background = cv2.resize(background, (width, height))
+        background = background[y0:y1, x0:x1]
+    return base_frame(out_w, out_h, background)
+
+
+def draw_path(frame, pts, color, thickness, show_dots, starts=None):
+    """Draws a run of points (contiguous int32, shape (n, 2)) as one polyline.
+
+    Dots go on every point but the first, which belongs to the previous run.
+    `starts` optionally lists indices into pts that begin a new stroke, not
+    joined to the point before (e.g. where the cursor re-enters a monitor);
+    all strokes still go to a single cv2.polylines call.
+    """
+    if len(pts) < 2:
+        return
+    strokes = [pts] if starts is None or not len(starts) else \
+        [s for s in np.split(pts, starts) if len(s) > 1]
+    cv2.polylines(frame, strokes, False, color, thickness, cv2.LINE_AA)
+    if show_dots:
+        radius = thickness//2 + 1
+        for x, y in pts[1:].tolist():
+            cv2.circle(frame, (x, y), radius, color, -1, cv2.LINE_AA)
+
+
+class FramePipeline:
+    """Encodes frames on a background thread while the caller keeps drawing.
+
+    A fixed pool of preallocated frame buffers cycles between the drawing
+    stage and the encoder through bounded queues, so nothing is allocated
+    per frame and the drawing stage blocks once it is `depth` frames ahead.
+    """
+
+    def __init__(self, writer, shape, depth=4, stats=None):
+        self.writer = writer
+        self.error = None
+        stats = stats or perf.PerfStats()
+        self._encode_ms = stats.histogram("export.encode_ms")
+        self._wait_ms = stats.histogram("export.wait_ms")
+        self._free = queue.Queue()
+        self._full = queue.Queue(maxsize=depth)
+        for _ in range(depth):
+            self._free.put(np.empty(shape, dtype=np.uint8))
+        self._thread = threading.Thread(target=self._encode, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        if self.error is not None:
+            raise self.error
+        start = time.perf_counter()
+        buf = self._free.get()
+        # Time blocked here is encoder backpressure
+        self._wait_ms.record((time.perf_counter() - start) * 1000)
+        np.copyto(buf, frame)
+        self._full.put(buf)
+
+    def close(self):
+        self._full.put(None)
+        self._thread.join()
+        self.writer.release()
+        if self.error is not None:
+            raise self.error
+
+    def _encode(self):
+        while True:
+            buf = self._full.get()
+            if buf is None:
+                return
+            if self.error is None:
+                try:
+                    start = time.perf_counter()
+                    self.writer.write(buf)
+                    self._encode_ms.record((time.perf_counter() - start) * 1000)
+                except Exception as e:
+                    self.error = e
+            self._free.put(buf)
+
+
+def render_video(filename, xy, t, width, height, color=DEFAULT_COLOR, thickness=4,
+                 show_dots=True, background=DEFAULT_BG, hz=30, speed=1.0, fps=None,
+                 simplify_px=0.0, mode="trace", dwell=True, out_height=None, crop=False,
+                 crop_padding=40, breaks=None, t_range=None, upsample_hz=None, progress=None,
+                 cancel=None, stats=None):
+    """Renders samples (xy in monitor pixels, t in ns) to a video file.
+
+    With fps=None the output runs at hz * speed, one frame per 1/hz of
+    recorded time. A fixed `fps` instead makes each frame cover
+    speed / fps seconds of recording, so the frame count follows the video
+    duration rather than the sample count. Each frame draws the samples
+    that fall into its window with a single cv2.polylines call.
+
+    `upsample_hz` smooths sparse captures by inserting centripetal
+    Catmull-Rom points up to that sample rate (see spline.upsample).
+    `simplify_px` > 0 then drops samples that change the path by less
+    than that many pixels (see simplify.simplify); kept samples retain
+    their timestamps, so playback timing is unchanged.
+
+    mode="heatmap" renders a growing density heatmap instead of the trace
+    (weighted by dwell time unless dwell=False); trace style options,
+    upsampling and simplification do not apply to it.
+
+    `out_height` scales the video to that height and `crop=True` trims it
+    to the path's bounding box plus `crop_padding` (see fit_transform).
+    Points, line thickness and the background are scaled once up front, so
+    drawing and encoding cost follows the output size, not the monitor's.
+
+    `breaks` is an optional boolean mask marking samples that start a new
+    stroke instead of joining the previous sample. `t_range` = (start, end)
+    in ns sets the recorded time the video covers (default: first to last
+    sample); samples before start appear in the first frame.
+
+    Drawing and encoding overlap through a FramePipeline. `progress(fraction)`
+    is called as frames are drawn; setting the `cancel` event stops the
+    export and removes the partial file. Per-frame draw, encode and
+    backpressure timings go to "export.*" histograms in `stats` (a
+    perf.PerfStats). Returns a dict of export stats, or None if cancelled.
+    """
+    n_recorded = len(t)
+    if upsample_hz and mode == "trace":
+        xy, t, breaks = spline.upsample(xy, t, upsample_hz, breaks)
+    n_points = len(t)
+    if simplify_px > 0 and mode == "trace":
+        # Both ends of every break must survive so strokes stay apart
+        keep = None if breaks is None else breaks | np.r_[breaks[1:], False]
+        idx = simplify.simplify(xy, simplify_px, keep=keep)
+        xy, t = xy[idx], t[idx]
+        if breaks is not None:
+            breaks = breaks[idx]
+
+    xy, out_w, out_h, region, scale = fit_transform(xy, width, height, out_height, crop, crop_padding)
+    thickness = max(1, round(thickness * scale))
+
+    if not fps:
+        fps = hz * speed
+    t_start, t_end = (t[0], t[-1]) if t_range is None else t_range
+    recorded_ns = int(t_end - t_start)
+    frame_ns = 1e9 * speed / fps
+    n_frames = int(recorded_ns / frame_ns) + 1
+    # Index one past the last sample visible in each frame
+    ends = np.searchsorted(t, t_start + np.arange(n_frames) * frame_ns, side="right")
+
+    out = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*'mp4v'), fps, (out_w, out_h))
+    frame = fitted_frame(width, height, background, region, out_w, out_h)
+    stats = stats or perf.PerfStats()
+    draw_ms = stats.histogram("export.draw_ms")
+    pipeline = FramePipeline(out, frame.shape, stats=stats)
+    if mode == "heatmap":
+        # Heatmap frames are rendered fresh from base, so base is never drawn on
+        base, heat = frame, heatmap.HeatmapAccumulator(out_w, out_h, dwell=dwell)
+    report_every = max(1, n_frames // 200)
+
+    start, cancelled = 0, False
+    try:
+        for k in range(n_frames):
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+                break
+            drawn_at = time.perf_counter()
+            end = ends[k]
+            if end > start and mode == "heatmap":
+                heat.add(xy[start:end], t[start:end])
+                frame = heat.render(base)
+                start = end
+            elif end > start:
+                # Include the previous sample so the new run joins the drawn path
+                lo = max(start - 1, 0)
+                seg = np.ascontiguousarray(xy[lo:end])
+                starts = None if breaks is None else np.flatnonzero(breaks[lo + 1:end]) + 1
+                draw_path(frame, seg, color, thickness, show_dots, starts)
+                start = end
+            draw_ms.record((time.perf_counter() - drawn_at) * 1000)
+            pipeline.submit(frame)
+            if progress is not None and k % report_every == 0:
+                progress(k / n_frames)
+    finally:
+        pipeline.close()
+
+    if cancelled:
+        os.remove(filename)
+        return None
+    return {"frames": n_frames, "fps": fps, "speed": speed, "width": out_w, "height": out_h,
+            "duration": recorded_ns / 1e9 / speed,
+            "points": n_points, "points_added": n_points - n_recorded,
+            "points_removed": n_points - len(t)}
+
+
+class LiveEncoder:
+    """Encodes a trace video while the recording is still running.
+
+    The capture thread push()es samples into a SampleRing; an encoder
+    thread draws each frame window once it is `lag` seconds old (late
+    samples, such as a throttled move the capture engine emits up to
+    about 1.5 periods after the fact, have arrived by then) and hands it
+    to a FramePipeline. Only the last `lag` seconds of samples are held in
+    memory. After the capture stops, finish() encodes the remaining frames
+    and returns the same stats as render_video; frame timing matches a
+    render_video call over the same samples.
+
+    `clock` returns the current recording time in ns (the capture engine's
+    timebase). `upsample_hz` smooths through a spline.SplineStream; frames
+    past the last final point wait until the held-back segment is known,
+    so during a pause encoding pauses too and the output still matches
+    render_video frame for frame. Trace mode only, without simplification
+    or cropping, since those need the whole path up front. If the ring
+    ever overflows the output is missing samples and `complete` turns
+    False.
+    """
+
+    def __init__(self, filename, width, height, clock, color=DEFAULT_COLOR, thickness=4,
+                 show_dots=True, background=DEFAULT_BG, hz=30, speed=1.0, fps=None,
+                 out_height=None, upsample_hz=None, lag=0.5, stats=None):
+        self.filename = filename
+        self.fps = fps or hz * speed
+        self.speed = speed
+        self.frames = 0
+        self.points = 0
+        self.recorded = 0
+        self._spline = spline.SplineStream(upsample_hz) if upsample_hz else None
+        self._clock = clock
+        self._lag_ns = int(lag * 1e9)
+        self._frame_ns = 1e9 * speed / self.fps
+        _, self.width, self.height, region, self._scale = fit_transform(
+            np.empty((0, 2), dtype=np.int32), width, height, out_height)
+        self._style = (color, max(1, round(thickness * self._scale)), show_dots)
+        self._frame = fitted_frame(width, height, background, region, self.width, self.height)
+        self._ring = SampleRing(capacity=65536)
+        self._pending_xy = np.empty((0, 2), dtype=np.int32)
+        self._pending_t = np.empty(0, dtype=np.int64)
+        self._last = None
+        # Time of the newest point that can no longer change
+        self._final_t = None
+        self._t_start = None
+        self._t_end = None
+        self._stop = threading.Event()
+        self._finished = False
+        stats = stats or perf.PerfStats()
+        self._draw_ms = stats.histogram("export.draw_ms")
+        out = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*'mp4v'), self.fps,
+                              (self.width, self.height))
+        self._pipeline = FramePipeline(out, self._frame.shape, stats=stats)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def complete(self):
+        return self._ring.overflowed == 0
+
+    def push(self, t, x, y):
+        # Capture thread only
+        self._ring.push(t, x, y)
+
+    def start(self):
+        self._thread.start()
+
+    def finish(self):
+        """Encodes everything left once capture has stopped; returns export stats."""
+        self._stop.set()
+        self._thread.join()
+        self._finished = True
+        try:
+            self._collect()
+            if self._spline is not None:
+                self._append(*self._spline.flush())
+            if self._t_start is not None:
+                # Same frame count as render_video over the whole recording
+                n_frames = int((self._t_end - self._t_start) / self._frame_ns) + 1
+                self._encode_until(self._t_start + (n_frames - 1) * self._frame_ns)
+        finally:
+            self._pipeline.close()
+        duration = 0.0 if self._t_start is None else (self._t_end - self._t_start) / 1e9 / self.speed
+        return {"frames": self.frames, "fps": self.fps, "speed": self.speed,
+                "width": self.width, "height": self.height, "duration": duration,
+                "points": self.points, "points_added": self.points - self.recorded,
+                "points_removed": 0}
+
+    def discard(self):
+        """Stops encoding and deletes the output."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        try:
+            if not self._finished:
+                self._finished = True
+                self._pipeline.close()
+        finally:
+            if os.path.exists(self.filename):
+                os.remove(self.filename)
+
+    def _run(self):
+        while not self._stop.wait(self._frame_ns / self.speed / 1e9 / 2):
+            self._tick()
+
+    def _tick(self):
+        self._collect()
+        if self._t_start is None:
+            return
+        until = self._clock() - self._lag_ns
+        if self._spline is not None:
+            # Settling the held-back sample would change its segment's shape
+            until = min(until, self._t_start - 1 if self._final_t is None else self._final_t)
+        self._encode_until(until)
+
+    def _collect(self):
+        batch = self._ring.drain()
+        if batch is None:
+            return
+        xy, t = batch
+        if self._t_start is None:
+            self._t_start = int(t[0])
+        self._t_end = int(t[-1])
+        self.recorded += len(t)
+        if self._spline is not None:
+            xy, t = self._spline.feed(xy, t)
+        self._append(xy, t)
+
+    def _append(self, xy, t):
+        if self._scale != 1.0:
+            xy = np.rint(xy * self._scale).astype(np.int32)
+        self.points += len(t)
+        if len(t):
+            self._final_t = int(t[-1])
+        self._pending_xy = np.concatenate((self._pending_xy, xy))
+        self._pending_t = np.concatenate((self._pending_t, t))
+
+    def _encode_until(self, until):
+        # Emit every frame whose window ends by `until`, each with the samples up to that end
+        while True:
+            end_t = self._t_start + self.frames * self._frame_ns
+            if end_t > until:
+                return
+            drawn_at = time.perf_counter()
+            n = np.searchsorted(self._pending_t, end_t, side="right")
+            if n:
+                seg = self._pending_xy[:n]
+                if self._last is not None:
+                    seg = np.vstack((self._last, seg))
+                draw_path(self._frame, np.ascontiguousarray(seg), *self._style)
+                self._last = self._pending_xy[n - 1].copy()
+                self._pending_xy, self._pending_t = self._pending_xy[n:], self._pending_t[n:]
+            self._draw_ms.record((time.perf_counter() - drawn_at) * 1000)
+            self._pipeline.submit(self._frame)
+            self.frames += 1
+            # Keep the ring drained while catching up on a backlog
+            if self.frames % 32 == 0:
+                self._collect()
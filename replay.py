@@ -0,0 +1,96 @@
+"""Seekable replay of a recorded path from periodic raster keyframes."""
+import os
+import shutil
+import tempfile
+import zlib
+
+import numpy as np
+
+
+class KeyframeIndex:
+    """Snapshots of a PreviewRaster every `every` samples of a path.
+
+    seek() restores the nearest keyframe at or before the target time and
+    draws only the samples after it, so a seek costs at most `every`
+    samples of drawing however long the session is. Keyframes are built
+    lazily by drawing on from the last one, so the first seek to a point
+    costs one pass over the path up to it. They are stored as
+    zlib-compressed differences from the raster's background (mostly
+    zeros, even over an image), and once they take more than `max_bytes`
+    further ones are spilled to a temporary directory until close().
+
+    `xy`/`t` are the samples to replay (e.g. an LOD tier with its
+    timestamps) and `style` is (color_bgr, thickness, show_dots).
+    """
+
+    def __init__(self, raster, xy, t, style, every=500, max_bytes=64 * 2**20):
+        self.raster = raster
+        self.xy, self.t = xy, t
+        self.style = style
+        self.every = every
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._base = raster.base.copy()
+        # Keyframe k holds the first k * every samples; each is compressed
+        # bytes in memory or the path of a spilled file
+        self._count = len(range(0, max(len(t), 1), every))
+        self._frames = []
+        self._spill_dir = None
+
+    def _extend(self, k):
+        raster = self.raster
+        if self._frames:
+            raster.show(self._load(len(self._frames) - 1))
+        else:
+            raster.show(self._base)
+            self._store(raster.frame)
+        while len(self._frames) <= k:
+            start = (len(self._frames) - 1) * self.every
+            raster.draw(self.xy[max(start - 1, 0):start + self.every], *self.style)
+            self._store(raster.frame)
+
+    def _store(self, frame):
+        blob = zlib.compress(np.subtract(frame, self._base).tobytes(), 1)
+        if self.nbytes + len(blob) <= self.max_bytes:
+            self.nbytes += len(blob)
+            self._frames.append(blob)
+            return
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="mpt-keyframes-")
+        path = os.path.join(self._spill_dir, f"{len(self._frames)}.kf")
+        with open(path, "wb") as f:
+            f.write(blob)
+        self._frames.append(path)
+
+    def _load(self, k):
+        blob = self._frames[k]
+        if isinstance(blob, str):
+            with open(blob, "rb") as f:
+                blob = f.read()
+        diff = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(self._base.shape)
+        return np.add(diff, self._base)
+
+    @property
+    def spilled(self):
+        return sum(isinstance(blob, str) for blob in self._frames)
+
+    def samples_at(self, time_ns):
+        """Number of samples recorded up to and including `time_ns`."""
+        return int(np.searchsorted(self.t, time_ns, side="right"))
+
+    def seek(self, time_ns):
+        """Shows the path as it was at `time_ns`; returns the samples shown."""
+        n = self.samples_at(time_ns)
+        k = min(n // self.every, self._count - 1)
+        if k >= len(self._frames):
+            self._extend(k)
+        self.raster.show(self._load(k))
+        start = k * self.every
+        self.raster.draw(self.xy[max(start - 1, 0):n], *self.style)
+        return n
+
+    def close(self):
+        self._frames = []
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
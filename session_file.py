@@ -0,0 +1,151 @@
+"""Binary session files (.mpts).
+
+Layout: a fixed HEADER_SIZE block holding the magic, format version and a
+JSON blob (monitor geometry, sample rate, style), then fixed-width
+little-endian (t, x, y) records appended while recording. The record count
+is implied by the file size, so a session cut short by a crash loads up to
+its last complete record.
+"""
+import json
+import os
+import struct
+import time
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b"MPTS"
+VERSION = 1
+HEADER_SIZE = 4096
+RECORD_DTYPE = np.dtype([("t", "<i8"), ("x", "<i4"), ("y", "<i4")])
+SESSION_EXT = ".mpts"
+
+Geometry = namedtuple("Geometry", "x y width height")
+
+
+def _pack_header(meta):
+    blob = json.dumps(meta).encode("utf-8")
+    head = MAGIC + struct.pack("<II", VERSION, len(blob)) + blob
+    if len(head) > HEADER_SIZE:
+        raise ValueError("Session header too large")
+    return head.ljust(HEADER_SIZE, b"\0")
+
+
+def new_session(directory, meta, prefix="session"):
+    """SessionWriter on a new timestamped file in `directory`.
+
+    Sessions started within the same second get a -2, -3, ... suffix.
+    """
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    n = 1
+    while True:
+        suffix = f"-{n}" if n > 1 else ""
+        try:
+            return SessionWriter(os.path.join(directory, f"{prefix}-{stamp}{suffix}{SESSION_EXT}"), meta)
+        except FileExistsError:
+            n += 1
+
+
+class SessionWriter:
+    """Streams records to disk in buffered blocks.
+
+    A block is written when it fills up or `flush_interval` seconds have
+    passed, so at most that much recording is lost if the app dies.
+    Raises FileExistsError rather than overwrite an existing session.
+    """
+
+    def __init__(self, path, meta, block=4096, flush_interval=1.0):
+        self.path = path
+        self.count = 0
+        self._f = open(path, "xb")
+        self._f.write(_pack_header(meta))
+        self._buf = np.empty(block, dtype=RECORD_DTYPE)
+        self._n = 0
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def append(self, t, x, y):
+        self._buf[self._n] = (t, x, y)
+        self._n += 1
+        self.count += 1
+        if self._n == len(self._buf) or time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._n:
+            self._f.write(self._buf[:self._n].tobytes())
+            self._n = 0
+        self._f.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self, meta=None):
+        self.flush()
+        if meta is not None:
+            # Header is fixed-size, so final settings can be rewritten in place
+            self._f.seek(0)
+            self._f.write(_pack_header(meta))
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+
+def read_meta(path):
+    with open(path, "rb") as f:
+        head = f.read(HEADER_SIZE)
+    if len(head) < HEADER_SIZE or head[:4] != MAGIC:
+        raise ValueError(f"Not a Mouse Path Tracer session: {path}")
+    version, size = struct.unpack_from("<II", head, 4)
+    if version > VERSION:
+        raise ValueError(f"Unsupported session version {version}: {path}")
+    return json.loads(head[12:12 + size].decode("utf-8"))
+
+
+def load_session(path):
+    """Returns (meta, records) with records memory-mapped, not parsed."""
+    meta = read_meta(path)
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if count <= 0:
+        return meta, np.empty(0, dtype=RECORD_DTYPE)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+    return meta, records
+
+
+def columns(records):
+    """Zero-copy (n, 2) int32 xy and int64 t views over session records."""
+    x = records["x"]
+    xy = np.lib.stride_tricks.as_strided(x, shape=(len(records), 2),
+                                         strides=(RECORD_DTYPE.itemsize, x.itemsize),
+                                         writeable=False)
+    return xy, records["t"]
+
+
+def monitor_geometry(meta):
+    return Geometry(**meta["monitor"])
+
+
+def monitor_layout(meta):
+    """Monitors of an all-monitor session relative to its desktop, else None."""
+    layout = meta.get("monitors")
+    return [Geometry(**m) for m in layout] if layout else None
+
+
+def virtual_desktop(monitors):
+    """Bounding box of all monitors in global coordinates."""
+    x0 = min(m.x for m in monitors)
+    y0 = min(m.y for m in monitors)
+    x1 = max(m.x + m.width for m in monitors)
+    y1 = max(m.y + m.height for m in monitors)
+    return Geometry(x0, y0, x1 - x0, y1 - y0)
+
+
+def monitor_tags(xy, layout):
+    """Index into `layout` of the monitor holding each sample, -1 for none.
+
+    Tags follow from the coordinates, so they are recomputed here rather
+    than stored in every record.
+    """
+    tags = np.full(len(xy), -1, dtype=np.int8)
+    x, y = xy[:, 0], xy[:, 1]
+    # Mirrored (overlapping) monitors resolve to the last one
+    for i, m in enumerate(layout):
+        tags[(x >= m.x) & (x < m.x + m.width) & (y >= m.y) & (y < m.y + m.height)] = i
+    return tags
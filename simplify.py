@@ -0,0 +1,113 @@
+"""Vectorized path simplification.
+
+All functions return sorted index arrays into the input, so callers keep
+the original timestamps of every retained sample (xy[idx], t[idx]) and
+playback timing stays correct.
+"""
+import numpy as np
+
+
+def dedup(xy):
+    """Drops samples inside stationary runs, keeping each run's first and last.
+
+    Keeping both ends of a run preserves the pause: the path waits at the
+    point until the last sample's timestamp before moving on.
+    """
+    n = len(xy)
+    if n < 3:
+        return np.arange(n)
+    same = np.all(xy[1:] == xy[:-1], axis=1)
+    keep = np.ones(n, dtype=bool)
+    keep[1:-1] = ~(same[:-1] & same[1:])
+    return np.flatnonzero(keep)
+
+
+def _holds(xy):
+    # Ends of stationary runs, which RDP must not remove
+    same = np.all(xy[1:] == xy[:-1], axis=1)
+    held = np.zeros(len(xy), dtype=bool)
+    held[1:] |= same
+    held[:-1] |= same
+    return held
+
+
+def _segment_distance(p, a, b):
+    ab = b - a
+    denom = np.einsum("ij,ij->i", ab, ab)
+    proj = np.einsum("ij,ij->i", p - a, ab)
+    u = np.clip(np.divide(proj, denom, out=np.zeros_like(proj), where=denom > 0), 0.0, 1.0)
+    closest = a + ab * u[:, None]
+    return np.hypot(*(p - closest).T)
+
+
+def rdp(xy, tolerance, keep=None):
+    """Ramer-Douglas-Peucker with all open segments split per NumPy pass.
+
+    `tolerance` is in the units of xy (pixels); points flagged in `keep`
+    are always retained.
+    """
+    n = len(xy)
+    if n < 3 or tolerance <= 0:
+        return np.arange(n)
+    pts = np.asarray(xy, dtype=np.float64)
+    kept = np.zeros(n, dtype=bool)
+    kept[0] = kept[-1] = True
+    if keep is not None:
+        kept |= keep
+    live = np.flatnonzero(~kept)
+    while len(live):
+        anchors = np.flatnonzero(kept)
+        seg = np.searchsorted(anchors, live) - 1
+        d = _segment_distance(pts[live], pts[anchors[seg]], pts[anchors[seg + 1]])
+        # live is sorted, so each open segment is a contiguous group
+        starts = np.flatnonzero(np.r_[True, seg[1:] != seg[:-1]])
+        group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(live)]))
+        seg_max = np.maximum.reduceat(d, starts)
+        at_max = np.flatnonzero(d == seg_max[group])
+        first = at_max[np.unique(group[at_max], return_index=True)[1]]
+        split = seg_max > tolerance
+        kept[live[first[split]]] = True
+        # Segments within tolerance are done; the rest continue without their new anchor
+        still = split[group]
+        still[first] = False
+        live = live[still]
+    return np.flatnonzero(kept)
+
+
+def simplify(xy, tolerance, base=None, keep=None):
+    """Dedup then RDP; returns indices of the samples to keep.
+
+    `base` optionally gives already-simplified indices to refine further.
+    Samples flagged in the boolean mask `keep` (e.g. stroke ends) survive
+    both passes.
+    """
+    idx = dedup(xy) if base is None else base
+    if keep is not None:
+        idx = np.union1d(idx, np.flatnonzero(keep))
+    if tolerance > 0 and len(idx) > 2:
+        sub = np.asarray(xy[idx])
+        held = _holds(sub)
+        if keep is not None:
+            held |= keep[idx]
+        idx = idx[rdp(sub, tolerance, keep=held)]
+    return idx
+
+
+class PathLOD:
+    """Nested level-of-detail tiers for one path, built lazily per tolerance.
+
+    Each tier is simplified from the finest cached tier below it, so coarse
+    preview tiers are cheap once an export tier exists.
+    """
+
+    def __init__(self, xy):
+        self.xy = xy
+        self._tiers = {}
+
+    def indices(self, tolerance):
+        tolerance = float(tolerance)
+        if tolerance not in self._tiers:
+            finer = [tol for tol in self._tiers if tol < tolerance]
+            base = self._tiers[max(finer)] if finer else None
+            self._tiers[tolerance] = simplify(self.xy, tolerance, base)
+        return self._tiers[tolerance]
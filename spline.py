@@ -0,0 +1,162 @@
+"""Timestamp-aware centripetal Catmull-Rom upsampling.
+
+Sparse captures (e.g. 20-30 Hz) are densified to a target rate by
+inserting points on a centripetal Catmull-Rom spline through the recorded
+samples. Recorded samples are kept as they are; inserted ones are spaced
+1/hz apart leading up to the next sample (evenly across the segment when
+it is shorter), so playback timing is unchanged and a pause before a move
+stays a pause rather than a slow crawl.
+The centripetal parameterization (alpha=0.5) avoids the loops and cusps a
+uniform spline produces at sharp turns.
+"""
+import numpy as np
+
+# Most points inserted into one segment, so a slow drag cannot blow up the count
+MAX_INSERT = 16
+
+
+def _knot(a, b, alpha):
+    # Coincident control points would give a zero-length knot interval
+    return np.maximum(np.hypot(*(b - a).T) ** alpha, 1e-4)[:, None]
+
+
+def _centripetal(p0, p1, p2, p3, f, alpha):
+    # Barry-Goldman pyramid evaluated at fraction f of the p1-p2 knot interval
+    t1 = _knot(p0, p1, alpha)
+    t2 = t1 + _knot(p1, p2, alpha)
+    t3 = t2 + _knot(p2, p3, alpha)
+    u = t1 + f[:, None] * (t2 - t1)
+    a1 = (t1 - u) / t1 * p0 + u / t1 * p1
+    a2 = (t2 - u) / (t2 - t1) * p1 + (u - t1) / (t2 - t1) * p2
+    a3 = (t3 - u) / (t3 - t2) * p2 + (u - t2) / (t3 - t2) * p3
+    b1 = (t2 - u) / t2 * a1 + u / t2 * a2
+    b2 = (t3 - u) / (t3 - t1) * a2 + (u - t1) / (t3 - t1) * a3
+    return (t2 - u) / (t2 - t1) * b1 + (u - t1) / (t2 - t1) * b2
+
+
+def _upsample(xy, t, hz, breaks, alpha, chunk):
+    n = len(t)
+    p = np.asarray(xy, dtype=np.float64)
+    t = np.asarray(t)
+    dt = np.diff(t)
+    # Enough points for `hz` across each segment, but none closer than a pixel apart
+    k = np.ceil(dt * (hz / 1e9)).astype(np.int64) - 1
+    k = np.clip(np.minimum(k, np.hypot(*(p[1:] - p[:-1]).T).astype(np.int64)), 0, MAX_INSERT)
+    if breaks is not None:
+        k[breaks[1:]] = 0
+    # Time the inserted points take: the tail of a long gap, e.g. an idle pause
+    span = np.minimum(dt, (k + 1) * (1e9 / hz))
+    orig = np.arange(n) + np.r_[0, np.cumsum(k)]
+    total = int(k.sum())
+    new_xy = np.empty((total, 2), dtype=np.int32)
+    new_t = np.empty(total, dtype=np.int64)
+    seg_all = np.repeat(np.arange(n - 1), k)
+    f_all = (np.arange(total) - np.repeat(orig[:-1] - np.arange(n - 1), k) + 1) / np.repeat(k + 1, k)
+    for lo in range(0, total, chunk):
+        seg, f = seg_all[lo:lo + chunk], f_all[lo:lo + chunk]
+        p1, p2 = p[seg], p[seg + 1]
+        # Reflect the missing neighbour at path and stroke ends
+        first = seg == 0
+        last = seg + 2 >= n
+        if breaks is not None:
+            first |= breaks[seg]
+            last |= breaks[np.minimum(seg + 2, n - 1)]
+        p0 = np.where(first[:, None], 2 * p1 - p2, p[np.maximum(seg - 1, 0)])
+        p3 = np.where(last[:, None], 2 * p2 - p1, p[np.minimum(seg + 2, n - 1)])
+        new_xy[lo:lo + chunk] = np.rint(_centripetal(p0, p1, p2, p3, f, alpha))
+        new_t[lo:lo + chunk] = t[seg + 1] - np.rint((1 - f) * span[seg]).astype(np.int64)
+    out_xy = np.empty((n + total, 2), dtype=np.int32)
+    out_t = np.empty(n + total, dtype=np.int64)
+    inserted = np.ones(n + total, dtype=bool)
+    inserted[orig] = False
+    out_xy[orig], out_t[orig] = xy, t
+    out_xy[inserted], out_t[inserted] = new_xy, new_t
+    out_breaks = None
+    if breaks is not None:
+        out_breaks = np.zeros(n + total, dtype=bool)
+        out_breaks[orig] = breaks
+    return out_xy, out_t, out_breaks, orig
+
+
+def upsample(xy, t, hz, breaks=None, alpha=0.5, chunk=1_000_000):
+    """Inserts spline points so moving stretches are sampled at about `hz`.
+
+    Returns (xy, t, breaks) as new int32/int64 arrays; `breaks` (a mask of
+    samples starting a new stroke, see render.render_video) is carried over
+    and no points are inserted across a break.
+
+    A 10 s pause before a 100 px move keeps the cursor resting; the 16
+    inserted points all fall into its last 16/60 s:
+
+    >>> xy, t, _ = upsample(np.array([[100, 0], [200, 0]]), np.array([0, 10 * 10**9]), 60)
+    >>> len(t), round(int(t[1]) / 1e9, 2), round(int(t[-2]) / 1e9, 2)
+    (18, 9.73, 9.98)
+    """
+    if len(t) < 2 or not hz:
+        return xy, t, breaks
+    return _upsample(xy, t, hz, breaks, alpha, chunk)[:3]
+
+
+def _empty():
+    return np.empty((0, 2), dtype=np.int32), np.empty(0, dtype=np.int64)
+
+
+class SplineStream:
+    """upsample() for samples arriving in batches, e.g. the live preview.
+
+    A segment's shape depends on the sample after it, so the newest sample
+    is held back until the next feed() or flush(). The concatenated output
+    equals upsample() over the whole path, unless settle() was used.
+    """
+
+    def __init__(self, hz, alpha=0.5):
+        self.hz, self.alpha = hz, alpha
+        # Last emitted sample, the one before it and the held-back one
+        self._xy = np.empty((0, 2), dtype=np.int32)
+        self._t = np.empty(0, dtype=np.int64)
+        self._started = False
+        self._settled = False
+
+    @property
+    def held_t(self):
+        """Timestamp of the held-back sample, or None."""
+        return int(self._t[-1]) if len(self._t) and not self._settled else None
+
+    def feed(self, xy, t):
+        """Adds a batch; returns (xy, t) of the points that are now final."""
+        if not len(t):
+            return _empty()
+        self._settled = False
+        return self._emit(np.concatenate((self._xy, xy)), np.concatenate((self._t, t)), False)
+
+    def settle(self):
+        """Emits the held-back sample as if the cursor had stopped on it.
+
+        For callers that cannot wait for the next sample during a pause.
+        The segment ends as it would if the next sample repeated the
+        position, and a copy of the sample stays behind as context.
+        """
+        if self._settled or not len(self._t):
+            return _empty()
+        xy, t = self._emit(np.concatenate((self._xy, self._xy[-1:])),
+                           np.concatenate((self._t, self._t[-1:])), False)
+        self._settled = True
+        return xy, t
+
+    def flush(self):
+        """Returns the rest once no more samples will come."""
+        xy, t = self._emit(self._xy, self._t, True)
+        self.__init__(self.hz, self.alpha)
+        return xy, t
+
+    def _emit(self, xy, t, final):
+        if not len(t) or (len(t) < 2 and not final):
+            self._xy, self._t = xy, t
+            return _empty()
+        out_xy, out_t, _, orig = _upsample(xy, t, self.hz, None, self.alpha, 1_000_000) \
+            if len(t) > 1 else (xy, t, None, np.zeros(1, dtype=np.int64))
+        start = orig[len(self._xy) - 2] + 1 if self._started else 0
+        end = len(out_t) if final else orig[-2] + 1
+        self._xy, self._t = xy[-3:], t[-3:]
+        self._started = True
+        return out_xy[start:end], out_t[start:end]
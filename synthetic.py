@@ -0,0 +1,73 @@
+"""Seeded synthetic cursor trajectories for benchmarks.
+
+Both generators return (xy, t) in the same layout the capture engine
+produces: int32 (n, 2) monitor pixels and int64 nanosecond timestamps
+starting at 0.
+"""
+import numpy as np
+
+
+def _bezier(p0, p1, p2, p3, u):
+    u = u[:, None]
+    v = 1 - u
+    return v**3 * p0 + 3 * v**2 * u * p1 + 3 * v * u**2 * p2 + u**3 * p3
+
+
+def _timestamps(seconds, hz, rng, jitter):
+    n = max(2, int(seconds * hz))
+    t = np.arange(n) / hz
+    if jitter:
+        t = np.sort(t + rng.normal(0, jitter / hz, n))
+        t -= t[0]
+    return (t * 1e9).astype(np.int64)
+
+
+def bezier_path(seconds, hz, width, height, seed=0):
+    """Smooth chained cubic Bezier strokes at a constant parametric speed."""
+    rng = np.random.default_rng(seed)
+    t = _timestamps(seconds, hz, rng, jitter=0)
+    n = len(t)
+    per_stroke = max(2, int(hz))
+    size = np.array([width, height], dtype=np.float64)
+    xy = np.empty((n, 2))
+    p0 = rng.random(2) * size
+    for start in range(0, n, per_stroke):
+        count = min(per_stroke, n - start)
+        p1, p2, p3 = rng.random((3, 2)) * size
+        xy[start:start + count] = _bezier(p0, p1, p2, p3, np.linspace(0, 1, count, endpoint=False))
+        p0 = p3
+    return np.clip(np.rint(xy), 0, size - 1).astype(np.int32), t
+
+
+def human_path(seconds, hz, width, height, seed=0, tremor=0.6):
+    """Aimed movements with pauses, tremor and sampling jitter.
+
+    Each move follows a slightly curved path with a minimum-jerk speed
+    profile and a Fitts'-law duration, followed by an exponential pause
+    during which the position holds still.
+    """
+    rng = np.random.default_rng(seed)
+    t = _timestamps(seconds, hz, rng, jitter=0.1)
+    secs = t / 1e9
+    size = np.array([width, height], dtype=np.float64)
+    xy = np.empty((len(t), 2))
+    moving = np.zeros(len(t), dtype=bool)
+    pos, clock, i = rng.random(2) * size, 0.0, 0
+    while i < len(t):
+        target = rng.random(2) * size
+        dist = np.hypot(*(target - pos))
+        move = 0.15 + 0.12 * np.log2(dist / 20 + 1)
+        pause = rng.exponential(0.4)
+        # Sideways control offset so strokes bend like a wrist arc
+        normal = np.array([-(target - pos)[1], (target - pos)[0]]) / max(dist, 1)
+        bend = normal * rng.normal(0, 0.15) * dist
+        c1, c2 = pos + (target - pos) / 3 + bend, pos + 2 * (target - pos) / 3 + bend
+        end = np.searchsorted(secs, clock + move + pause, side="right")
+        tau = np.clip((secs[i:end] - clock) / move, 0, 1)
+        u = tau**3 * (10 - 15 * tau + 6 * tau**2)
+        xy[i:end] = _bezier(pos, c1, c2, target, u)
+        moving[i:end] = tau < 1
+        pos, clock, i = target, clock + move + pause, end
+    # Tremor only while moving; a resting mouse reports a steady position
+    xy[moving] += rng.normal(0, tremor, (moving.sum(), 2))
+    return np.clip(np.rint(xy), 0, size - 1).astype(np.int32), t